@@ -0,0 +1,116 @@
+"""Аутентификация по JWT без чтения пользователя из базы.
+
+Токен доступа несёт роль и флаги пользователя в claims, по ним
+проверяются права. Claims действительны, пока версия прав в токене
+совпадает с текущей версией пользователя из общего кэша: смена роли или
+флагов увеличивает её и отзывает старые токены. Полный объект модели
+загружается только по обращению к атрибутам, которых нет в токене.
+"""
+from django.conf import settings
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.cache import user_cache
+from users.signals import get_access_version
+
+ACCESS_CLAIMS = ("role", "is_staff", "is_superuser", "access_version")
+
+
+def get_access_token(user):
+    """Токен доступа с ролью и флагами пользователя в claims."""
+    token = AccessToken.for_user(user)
+    for claim in ACCESS_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+def get_current_user(user_id, version=None):
+    """Пользователь из кэша процесса, не старше версии прав ``version``.
+
+    Копия с другой версией, например изменённая другим процессом,
+    загружается из базы заново.
+    """
+    if version is None:
+        version = get_access_version(user_id)
+    user = user_cache.get(user_id)
+    if user is not None and user.access_version != version:
+        user_cache.invalidate(user_id)
+        user = user_cache.get(user_id)
+    if user is None:
+        raise AuthenticationFailed(
+            "Пользователь не найден.", code="user_not_found"
+        )
+    return user
+
+
+def get_user_instance(user):
+    """Объект модели для пользователя запроса, например для внешних ключей."""
+    if isinstance(user, ClaimsUser):
+        return user.instance
+    return user
+
+
+class ClaimsUser(TokenUser):
+    """Пользователь запроса, собранный из claims токена."""
+
+    @cached_property
+    def username(self):
+        # TokenUser читает отсутствующий claim и вернул бы пустую строку.
+        return self.instance.username
+
+    @cached_property
+    def instance(self):
+        return get_current_user(self.id, self.token["access_version"])
+
+    @cached_property
+    def role(self):
+        return self.token["role"]
+
+    @property
+    def is_moderator(self):
+        return self.role == settings.MODERATOR
+
+    @property
+    def is_admin(self):
+        return self.role == settings.ADMIN or self.is_superuser
+
+    def __getattr__(self, attr):
+        if attr.startswith("_") or attr in ("token", "instance"):
+            raise AttributeError(attr)
+        return getattr(self.instance, attr)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication, доверяющая claims роли вместо строки в базе.
+
+    Токен без claims или со старой версией прав обрабатывается как
+    раньше: права проверяются по самому пользователю.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                "Токен не содержит идентификатора пользователя."
+            )
+        version = get_access_version(user_id)
+        if version is None:
+            raise AuthenticationFailed(
+                "Пользователь не найден.", code="user_not_found"
+            )
+        if all(claim in validated_token for claim in ACCESS_CLAIMS) and (
+            validated_token["access_version"] == version
+        ):
+            return ClaimsUser(validated_token)
+        user = get_current_user(user_id, version)
+        if not user.is_active:
+            raise AuthenticationFailed(
+                "Пользователь неактивен.", code="user_inactive"
+            )
+        return user
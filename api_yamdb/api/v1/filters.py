@@ -1,13 +1,125 @@
+import threading
+import time
+from collections import defaultdict
+
 import django_filters
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
 
+from reviews.cache import get_cache_versions
 from reviews.models import Title
+from reviews.search import TITLE_MATCH_SQL, TITLE_RANK_SQL, build_match_query
 
 
 class TitleFilter(django_filters.FilterSet):
     category = django_filters.CharFilter(field_name="category__slug")
     genre = django_filters.CharFilter(field_name="genre__slug")
     name = django_filters.CharFilter(lookup_expr="contains")
+    q = django_filters.CharFilter(method="filter_q")
 
     class Meta:
         model = Title
-        fields = ["category", "genre", "name", "year"]
+        fields = ["category", "genre", "name", "year", "q"]
+
+    def filter_q(self, queryset, name, value):
+        """Полнотекстовый поиск по названию и описанию по релевантности."""
+        match = build_match_query(value)
+        if match is None:
+            return queryset.none()
+        if connection.vendor != "sqlite":
+            return queryset.filter(
+                Q(name__icontains=value) | Q(description__icontains=value)
+            )
+        return (
+            queryset.filter(pk__in=RawSQL(TITLE_MATCH_SQL, (match,)))
+            .annotate(search_rank=RawSQL(TITLE_RANK_SQL, (match,)))
+            .order_by("search_rank", "-id")
+        )
+
+
+class NameIndex:
+    """Индекс подстрок названий модели в памяти процесса.
+
+    Хранит n-граммы длиной до ``GRAM_SIZE`` символов от названий,
+    приведённых через ``str.casefold``, поэтому регистр кириллицы
+    сравнивается корректно, в отличие от LIKE в SQLite. Индекс лениво
+    перестраивается, когда сигналы меняют версию данных модели, и в любом
+    случае не реже раза в ``RESPONSE_CACHE_TIMEOUT`` секунд: версия живёт
+    в кэше процесса, и записи из других процессов её не меняют.
+    """
+
+    GRAM_SIZE = 3
+
+    def __init__(self, model):
+        self.model = model
+        self.version = None
+        self.built_at = None
+        self.names = {}
+        self.grams = {}
+        self.lock = threading.Lock()
+
+    def is_fresh(self, version):
+        return (
+            version == self.version
+            and time.monotonic() - self.built_at
+            < settings.RESPONSE_CACHE_TIMEOUT
+        )
+
+    def refresh(self):
+        (version,) = get_cache_versions([self.model._meta.model_name])
+        if self.is_fresh(version):
+            return
+        with self.lock:
+            if self.is_fresh(version):
+                return
+            names = {
+                pk: name.casefold()
+                for pk, name in self.model.objects.values_list("pk", "name")
+            }
+            grams = defaultdict(set)
+            for pk, name in names.items():
+                for size in range(1, self.GRAM_SIZE + 1):
+                    for start in range(len(name) - size + 1):
+                        grams[name[start:start + size]].add(pk)
+            self.names, self.grams = names, dict(grams)
+            self.version = version
+            self.built_at = time.monotonic()
+
+    def search(self, term):
+        """Возвращает pk объектов, в названии которых есть ``term``."""
+        self.refresh()
+        names, grams = self.names, self.grams
+        term = term.casefold()
+        if len(term) <= self.GRAM_SIZE:
+            return set(grams.get(term, ()))
+        postings = sorted(
+            (
+                grams.get(term[start:start + self.GRAM_SIZE], set())
+                for start in range(len(term) - self.GRAM_SIZE + 1)
+            ),
+            key=len,
+        )
+        candidates = set.intersection(*postings)
+        return {pk for pk in candidates if term in names[pk]}
+
+
+class NameIndexSearchFilter(filters.SearchFilter):
+    """``?search=`` по названию через ``NameIndex`` без LIKE-сканирования."""
+
+    indexes = {}
+
+    def get_index(self, model):
+        if model not in self.indexes:
+            self.indexes.setdefault(model, NameIndex(model))
+        return self.indexes[model]
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        index = self.get_index(queryset.model)
+        found = set.intersection(*(index.search(term) for term in terms))
+        return queryset.filter(pk__in=found)
@@ -1,7 +1,20 @@
-from rest_framework import mixins, viewsets
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import mixins, status, viewsets
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+from reviews.cache import (
+    get_cache_versions,
+    version_to_datetime,
+    versions_are_shared,
+)
+
 
 class CreateViewSet(mixins.CreateModelMixin, GenericViewSet):
     pass
@@ -39,6 +52,119 @@ class PatchModelMixin:
         return Response(serializer.data)
 
 
+class ResponseCacheMixin:
+    """Кэширует ответ list до изменения моделей из ``cache_models``.
+
+    Ключ включает версии моделей, поэтому при их изменении старые записи
+    просто перестают читаться и вытесняются кэшем сами. Если версии не
+    общие для процессов, ответы не кэшируются.
+    """
+
+    cache_models = ()
+
+    def get_cache_role(self, user):
+        if not user.is_authenticated:
+            return "anonymous"
+        if user.is_staff or user.is_admin:
+            return settings.ADMIN
+        return user.role
+
+    def get_response_cache_key(self, request):
+        versions = ":".join(
+            str(version) for version in get_cache_versions(self.cache_models)
+        )
+        path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        role = self.get_cache_role(request.user)
+        return f"response:{self.basename}:{versions}:{role}:{path}"
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not versions_are_shared():
+            return handler(request, *args, **kwargs)
+        key = self.get_response_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class ResponseCacheRetrieveMixin(ResponseCacheMixin):
+    """Кэширует ответы list и retrieve."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class ConditionalGetMixin:
+    """Отвечает 304 на list и retrieve, если данные не менялись.
+
+    Представление реализует ``get_validators``, возвращающий ETag и время
+    последнего изменения; валидаторы должны считаться без выборки страницы.
+    Они строятся по версиям данных, поэтому, если версии не общие для
+    процессов, ответы отдаются без ETag и Last-Modified.
+    """
+
+    def get_validators(self):
+        raise NotImplementedError
+
+    def get_versions_validators(self, version_names, queryset=None):
+        """Валидаторы по версиям данных и агрегатам по индексам queryset.
+
+        Агрегаты замечают и изменения в обход сигналов (массовые вставки),
+        версии - правки существующих строк.
+        """
+        versions = get_cache_versions(version_names)
+        parts = [str(version) for version in versions]
+        lookup = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        if lookup is not None:
+            # Ответы разных объектов не должны делить ETag.
+            parts.insert(0, str(lookup))
+        last_modified = version_to_datetime(max(versions))
+        if queryset is not None:
+            stats = queryset.order_by().aggregate(
+                count=Count("pk"), last_id=Max("pk"), last_date=Max("pub_date")
+            )
+            parts += [str(stats["count"]), str(stats["last_id"])]
+            if stats["last_date"]:
+                last_modified = max(last_modified, stats["last_date"])
+        return "-".join(parts), last_modified
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        if not versions_are_shared():
+            return handler(request, *args, **kwargs)
+        etag, last_modified = self.get_validators()
+        etag = quote_etag(etag)
+        last_modified = int(last_modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (
+            status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED
+        ):
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
 class ModelViewSetWithoutPut(
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
@@ -0,0 +1,123 @@
+import hashlib
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+from rest_framework.response import Response
+
+
+class CachedCountPagination(LimitOffsetPagination):
+    """Limit/offset без полного ``COUNT(*)`` на каждый запрос.
+
+    Небольшие выборки считаются точно запросом с ограничением
+    ``PAGINATION_COUNT_THRESHOLD + 1`` строк. Если строк больше порога,
+    ``count`` считается целиком один раз и отдаётся из кэша, ключ которого
+    строится по пути и параметрам фильтрации, поэтому в пределах
+    ``PAGINATION_COUNT_CACHE_TIMEOUT`` значение может быть оценочным.
+    Представление с ``count_cache_per_user = True`` отдаёт выборку текущего
+    пользователя, и в ключ добавляется его ``pk``.
+    Параметр ``?count=false`` отключает подсчёт совсем.
+    """
+
+    count_query_param = "count"
+    page_query_params = ("limit", "offset", "cursor", "count")
+    count_skipped = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.view = view
+        self.count_skipped = request.query_params.get(
+            self.count_query_param, ""
+        ).lower() in ("0", "false")
+        if not self.count_skipped:
+            return super().paginate_queryset(queryset, request, view)
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.offset = self.get_offset(request)
+        page = list(queryset[self.offset:self.offset + self.limit + 1])
+        # Нижняя граница числа строк: её достаточно для ссылки next.
+        self.count = self.offset + len(page)
+        return page[:self.limit]
+
+    def get_count_cache_key(self):
+        params = sorted(
+            (key, value)
+            for key, values in self.request.query_params.lists()
+            if key not in self.page_query_params
+            for value in values
+        )
+        raw = f"{self.request.path}?{params}"
+        if getattr(self.view, "count_cache_per_user", False):
+            raw += f"#user={self.request.user.pk}"
+        raw = raw.encode()
+        return f"pagination-count:{hashlib.md5(raw).hexdigest()}"
+
+    def get_count(self, queryset):
+        key = self.get_count_cache_key()
+        count = cache.get(key)
+        if count is not None:
+            return count
+        threshold = settings.PAGINATION_COUNT_THRESHOLD
+        count = queryset[:threshold + 1].count()
+        if count <= threshold:
+            return count
+        count = queryset.count()
+        cache.set(key, count, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+        return count
+
+    def get_paginated_response(self, data):
+        if not self.count_skipped:
+            return super().get_paginated_response(data)
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+
+class KeysetPagination(CursorPagination):
+    """Курсорная пагинация: стоимость страницы не зависит от её глубины."""
+
+    page_size_query_param = "limit"
+    max_page_size = 100
+
+
+class LimitOffsetOrCursorPagination(CachedCountPagination):
+    """Limit/offset по умолчанию, курсорная пагинация по запросу.
+
+    Клиент включает курсорный режим, передав параметр ``cursor``
+    (для первой страницы - пустой: ``?cursor=``), и дальше ходит по ссылкам
+    ``next``/``previous``. Порядок задаётся атрибутом ``cursor_ordering``
+    представления и должен совпадать с ``Meta.ordering`` модели,
+    дополненным уникальным полем.
+    """
+
+    cursor_query_param = "cursor"
+    cursor_pagination = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params:
+            return super().paginate_queryset(queryset, request, view)
+        self.cursor_pagination = KeysetPagination()
+        self.cursor_pagination.ordering = getattr(
+            view, "cursor_ordering", "-id"
+        )
+        return self.cursor_pagination.paginate_queryset(
+            queryset, request, view
+        )
+
+    def get_paginated_response(self, data):
+        if self.cursor_pagination is not None:
+            return self.cursor_pagination.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.cursor_pagination is not None:
+            return self.cursor_pagination.to_html()
+        return super().to_html()
@@ -1,9 +1,20 @@
 from django.contrib.auth import get_user_model
-from django.shortcuts import get_object_or_404
+from django.db import transaction
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
+from rest_framework.relations import MANY_RELATION_KWARGS, ManyRelatedField
 
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.cache import bump_cache_version
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    Review,
+    Title,
+    TitleRanking,
+    TitleRatingStats,
+)
+from reviews.ranking import refresh_title_ranking
 
 User = get_user_model()
 
@@ -30,6 +41,30 @@ class UserSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Использовать имя me запрещено")
         return username
 
+    def validate(self, attrs):
+        # Уникальные индексы users_user_*_ci_uniq сравнивают без учёта
+        # регистра, встроенные проверки модели - с учётом.
+        if "username" not in attrs and "email" not in attrs:
+            return attrs
+        matches = User.find_casefold(
+            attrs.get("username", ""), attrs.get("email", "")
+        )
+        if self.instance is not None:
+            matches = matches.exclude(pk=self.instance.pk)
+        errors = {}
+        for user in matches[:2]:
+            if user.same_username and "username" in attrs:
+                errors["username"] = [
+                    "Пользователь с таким username уже существует."
+                ]
+            if user.same_email and "email" in attrs:
+                errors["email"] = [
+                    "Пользователь с таким email уже существует."
+                ]
+        if errors:
+            raise ValidationError(errors)
+        return attrs
+
 
 class UserCreateSerializer(serializers.Serializer):
     email = serializers.EmailField(max_length=254)
@@ -41,6 +76,69 @@ class UserCreateSerializer(serializers.Serializer):
         return username
 
 
+class SlugListRelatedField(ManyRelatedField):
+    """Список slug, разрешаемый одним запросом ``slug__in``."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+        child = self.child_relation
+        slugs = list(dict.fromkeys(str(slug) for slug in data))
+        found = child.get_lookup()
+        if found is None:
+            found = {
+                getattr(obj, child.slug_field): obj
+                for obj in child.get_queryset().filter(
+                    **{f"{child.slug_field}__in": slugs}
+                )
+            }
+        missing = [slug for slug in slugs if slug not in found]
+        if missing:
+            raise ValidationError(
+                [
+                    child.error_messages["does_not_exist"].format(
+                        slug_name=child.slug_field, value=slug
+                    )
+                    for slug in missing
+                ]
+            )
+        return [found[slug] for slug in slugs]
+
+
+class BulkSlugRelatedField(serializers.SlugRelatedField):
+    """SlugRelatedField, который не ходит в базу по каждому slug.
+
+    При many=True список разрешается одним запросом. Если в контексте
+    сериализатора есть ``slug_lookup`` - словарь ``{модель: {slug: объект}}``,
+    заранее собранный для пачки данных, - запросов нет совсем.
+    """
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {"child_relation": cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return SlugListRelatedField(**list_kwargs)
+
+    def get_lookup(self):
+        lookups = self.context.get("slug_lookup")
+        if lookups is None:
+            return None
+        return lookups.get(self.get_queryset().model)
+
+    def to_internal_value(self, data):
+        lookup = self.get_lookup()
+        if lookup is None:
+            return super().to_internal_value(data)
+        try:
+            return lookup[str(data)]
+        except KeyError:
+            self.fail("does_not_exist", slug_name=self.slug_field, value=data)
+
+
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
@@ -56,10 +154,10 @@ class GenreSerializer(serializers.ModelSerializer):
 class TitlePostSerializer(serializers.ModelSerializer):
     """Сериализатор для post-запросов модели Title."""
 
-    genre = serializers.SlugRelatedField(
+    genre = BulkSlugRelatedField(
         queryset=Genre.objects.all(), slug_field="slug", many=True
     )
-    category = serializers.SlugRelatedField(
+    category = BulkSlugRelatedField(
         queryset=Category.objects.all(),
         slug_field="slug",
     )
@@ -75,6 +173,107 @@ class TitlePostSerializer(serializers.ModelSerializer):
             "category",
         ]
 
+    def create(self, validated_data):
+        genres = validated_data.pop("genre")
+        title = super().create(validated_data)
+        self.set_genres(title, genres, created=True)
+        return title
+
+    @staticmethod
+    def get_slug_lookup(items):
+        """Разрешает slug жанров и категорий всей пачки двумя запросами."""
+        genre_slugs, category_slugs = set(), set()
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            genres = item.get("genre")
+            if isinstance(genres, list):
+                genre_slugs.update(str(slug) for slug in genres)
+            if item.get("category") is not None:
+                category_slugs.add(str(item["category"]))
+        return {
+            Genre: {
+                genre.slug: genre
+                for genre in Genre.objects.filter(slug__in=genre_slugs)
+            },
+            Category: {
+                category.slug: category
+                for category in Category.objects.filter(
+                    slug__in=category_slugs
+                )
+            },
+        }
+
+    @staticmethod
+    def bulk_create(items):
+        """Создаёт произведения из validated_data одной транзакцией.
+
+        Произведения вставляются через ``bulk_create``, связи с жанрами -
+        одной массовой вставкой в связующую таблицу.
+        """
+        through = Title.genre.through
+        with transaction.atomic():
+            titles = Title.objects.bulk_create(
+                [
+                    Title(
+                        **{
+                            key: value
+                            for key, value in item.items()
+                            if key != "genre"
+                        }
+                    )
+                    for item in items
+                ]
+            )
+            if titles and titles[0].pk is None:
+                # bulk_create на SQLite не возвращает pk. Транзакция держит
+                # блокировку записи, поэтому последние строки - наши.
+                pks = Title.objects.order_by("-pk").values_list(
+                    "pk", flat=True
+                )[:len(titles)]
+                for title, pk in zip(titles, list(pks)[::-1]):
+                    title.pk = pk
+            through.objects.bulk_create(
+                through(title_id=title.pk, genre_id=genre.pk)
+                for title, item in zip(titles, items)
+                for genre in item["genre"]
+            )
+        bump_cache_version(Title._meta.model_name)
+        return titles
+
+    def update(self, instance, validated_data):
+        genres = validated_data.pop("genre", None)
+        instance = super().update(instance, validated_data)
+        if genres is not None:
+            self.set_genres(instance, genres)
+        return instance
+
+    def set_genres(self, title, genres, created=False):
+        """Записывает в связующую таблицу только изменившиеся строки."""
+        through = Title.genre.through
+        new_ids = {genre.pk for genre in genres}
+        old_ids = set()
+        if not created:
+            old_ids = set(
+                through.objects.filter(title=title).values_list(
+                    "genre_id", flat=True
+                )
+            )
+        if old_ids - new_ids:
+            through.objects.filter(
+                title=title, genre_id__in=old_ids - new_ids
+            ).delete()
+        if new_ids - old_ids:
+            through.objects.bulk_create(
+                through(title=title, genre_id=genre_id)
+                for genre_id in new_ids - old_ids
+            )
+        if old_ids != new_ids:
+            # bulk-операции не отправляют m2m_changed.
+            bump_cache_version(Title._meta.model_name)
+            if not created:
+                refresh_title_ranking(title)
+
 
 class TitleGetSerializer(serializers.ModelSerializer):
     """Сериализатор для get-запросов модели Title."""
@@ -96,8 +295,36 @@ class TitleGetSerializer(serializers.ModelSerializer):
         ]
 
 
+class TitleRankingSerializer(serializers.ModelSerializer):
+    """Сериализатор места произведения в таблице лидеров."""
+
+    title = TitleGetSerializer(read_only=True)
+
+    class Meta:
+        model = TitleRanking
+        fields = ["score", "title"]
+
+
+class TitleRatingStatsSerializer(serializers.ModelSerializer):
+    """Сериализатор гистограммы оценок произведения."""
+
+    scores = serializers.DictField(child=serializers.IntegerField())
+    total = serializers.IntegerField()
+    mean = serializers.FloatField(allow_null=True)
+
+    class Meta:
+        model = TitleRatingStats
+        fields = ["title", "scores", "total", "mean"]
+
+
 class ReviewSerializer(serializers.ModelSerializer):
-    """Сериализатор для модели Review."""
+    """Сериализатор для модели Review.
+
+    Повторный отзыв отсекает ограничение ``unique_review`` при вставке,
+    представление превращает его ошибку в ``duplicate_message``.
+    """
+
+    duplicate_message = "Вы не можете повторно оставить рецензию."
 
     author = serializers.SlugRelatedField(
         slug_field="username", read_only=True
@@ -107,18 +334,6 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         fields = ["id", "text", "author", "score", "pub_date"]
 
-    def validate(self, data):
-        request = self.context["request"]
-        author = request.user
-        title_id = self.context["view"].kwargs.get("title_id")
-        title = get_object_or_404(Title, pk=title_id)
-        if request.method == "POST":
-            if Review.objects.filter(title=title, author=author).exists():
-                raise ValidationError(
-                    "Вы не можете повторно оставить рецензию."
-                )
-        return data
-
 
 class CommentSerializer(serializers.ModelSerializer):
     """Сериализатор для модели Comment."""
@@ -130,3 +345,32 @@ class CommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
         fields = ["id", "text", "author", "pub_date"]
+
+
+class UserReviewSerializer(ReviewSerializer):
+    """Отзыв в ленте пользователя: с произведением, к которому он оставлен."""
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ["title"]
+
+
+class UserCommentSerializer(CommentSerializer):
+    """Комментарий в ленте пользователя: с отзывом и произведением."""
+
+    title = serializers.IntegerField(read_only=True)
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ["review", "title"]
+
+
+class ReviewWithCommentsSerializer(ReviewSerializer):
+    """Отзыв с числом комментариев и последними комментариями."""
+
+    comments_count = serializers.IntegerField(read_only=True)
+    latest_comments = CommentSerializer(many=True, read_only=True, default=[])
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + [
+            "comments_count",
+            "latest_comments",
+        ]
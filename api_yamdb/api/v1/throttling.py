@@ -0,0 +1,147 @@
+"""Ограничение частоты запросов к эндпоинтам регистрации и получения токена.
+
+Каждый ключ (IP, email, username) получает корзину токенов ёмкостью
+``N`` из ставки ``"N/период"``, которая наполняется за период целиком.
+По умолчанию корзины живут в памяти процесса, разбитые на сегменты со
+своими блокировками. Бэкенд ``"cache"`` хранит их в кэше
+``AUTH_RATE_LIMIT_CACHE`` (например, файловом), общем для процессов; его
+обновление не атомарно, поэтому лимит там приблизительный.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """``"20/min"`` -> (ёмкость 20, пополнение токенов в секунду)."""
+    count, period = rate.split("/")
+    count = int(count)
+    return count, count / DURATIONS[period[0]]
+
+
+def take_token(state, capacity, refill, now):
+    """Новое состояние корзины и время ожидания, 0 если токен выдан."""
+    tokens, updated = state or (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * refill)
+    if tokens >= 1:
+        return (tokens - 1, now), 0.0
+    return (tokens, now), (1 - tokens) / refill
+
+
+class MemoryBuckets:
+    """Корзины в памяти процесса: O(1) на запрос, блокировка на сегмент.
+
+    В сегменте хранятся последние ``max_keys / shards`` ключей: вытесненный
+    ключ начинает с полной корзины.
+    """
+
+    def __init__(self, shards=64, max_keys=100000):
+        self.shards = [
+            (threading.Lock(), OrderedDict()) for _ in range(shards)
+        ]
+        self.shard_size = max(1, max_keys // shards)
+
+    def consume(self, key, capacity, refill):
+        lock, buckets = self.shards[hash(key) % len(self.shards)]
+        now = time.monotonic()
+        with lock:
+            state, wait = take_token(
+                buckets.pop(key, None), capacity, refill, now
+            )
+            buckets[key] = state
+            if len(buckets) > self.shard_size:
+                buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        for lock, buckets in self.shards:
+            with lock:
+                buckets.clear()
+
+
+class CacheBuckets:
+    """Корзины в кэше Django, общем для нескольких процессов."""
+
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def consume(self, key, capacity, refill):
+        key = f"rate-limit:{key}"
+        state, wait = take_token(
+            self.cache.get(key), capacity, refill, time.time()
+        )
+        # Через время полного наполнения корзина равна новой.
+        self.cache.set(key, state, math.ceil(capacity / refill))
+        return wait
+
+    def clear(self):
+        # Записи истекают сами, общий кэш целиком не очищается.
+        pass
+
+
+memory_buckets = MemoryBuckets()
+
+
+def get_buckets():
+    if settings.AUTH_RATE_LIMIT_BACKEND == "cache":
+        return CacheBuckets(settings.AUTH_RATE_LIMIT_CACHE)
+    return memory_buckets
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Корзина токенов на ключ запроса со ставкой ``AUTH_RATE_LIMITS[scope]``.
+
+    Превышение даёт 429 с заголовком ``Retry-After``.
+    """
+
+    scope = None
+    wait_time = None
+
+    def get_key(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        key = self.get_key(request)
+        if not key:
+            return True
+        capacity, refill = parse_rate(settings.AUTH_RATE_LIMITS[self.scope])
+        self.wait_time = get_buckets().consume(
+            f"{self.scope}:{key}", capacity, refill
+        )
+        return not self.wait_time
+
+    def wait(self):
+        return math.ceil(self.wait_time)
+
+
+class AuthIPThrottle(TokenBucketThrottle):
+    scope = "auth-ip"
+
+    def get_key(self, request):
+        return self.get_ident(request)
+
+
+class AuthEmailThrottle(TokenBucketThrottle):
+    scope = "auth-email"
+
+    def get_key(self, request):
+        email = request.data.get("email")
+        return email.lower() if isinstance(email, str) else None
+
+
+class AuthUsernameThrottle(TokenBucketThrottle):
+    scope = "auth-username"
+
+    def get_key(self, request):
+        username = request.data.get("username")
+        return username.lower() if isinstance(username, str) else None
+
+
+AUTH_THROTTLES = (AuthIPThrottle, AuthEmailThrottle, AuthUsernameThrottle)
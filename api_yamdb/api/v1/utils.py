@@ -1,12 +1,70 @@
-from django.core.mail import send_mail
+import json
+
 from django.conf import settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from reviews.models import Comment, Review
+from users.outbox import enqueue_email
+
+COMMENT_FIELDS = ("id", "text", "author", "pub_date")
+
+
+def confirmation_message(email, confirmation_code):
+    """Письмо с кодом подтверждения в формате send_mass_mail."""
+    return (
+        "Код подтверждения",
+        f"Код подтверждения: {confirmation_code}",
+        settings.EMAIL_YAMDB,
+        [email],
+    )
 
 
 def send_confirmation_code(email, confirmation_code):
-    send_mail(
-        subject="Код подтверждения",
-        message=f"Код подтверждения: {confirmation_code}",
-        from_email=settings.EMAIL_YAMDB,
-        recipient_list=(email,),
-        fail_silently=False,
+    # Письмо уходит из очереди командой send_outbox, а не в запросе.
+    subject, body, from_email, _ = confirmation_message(
+        email, confirmation_code
+    )
+    enqueue_email(subject, body, from_email, email)
+
+
+def iter_title_export(title_id):
+    """Строки NDJSON: отзывы произведения, каждый со своими комментариями.
+
+    Отзывы и комментарии читаются двумя курсорами пачками по
+    ``EXPORT_CHUNK_SIZE`` и сливаются по ``review_id``, поэтому в памяти
+    держатся только текущая пачка и комментарии одного отзыва.
+    """
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    reviews = (
+        Review.objects.filter(title_id=title_id)
+        .order_by("id")
+        .values_list("id", "text", "author__username", "score", "pub_date")
+        .iterator(chunk_size=chunk_size)
+    )
+    comments = (
+        Comment.objects.filter(review__title_id=title_id)
+        .order_by("review_id", "id")
+        .values_list(
+            "review_id", "id", "text", "author__username", "pub_date"
+        )
+        .iterator(chunk_size=chunk_size)
     )
+    comment = next(comments, None)
+    for review_id, text, author, score, pub_date in reviews:
+        # Комментарии к отзывам, добавленным после начала выгрузки,
+        # пропускаются вместе с самими отзывами.
+        while comment is not None and comment[0] < review_id:
+            comment = next(comments, None)
+        review_comments = []
+        while comment is not None and comment[0] == review_id:
+            review_comments.append(dict(zip(COMMENT_FIELDS, comment[1:])))
+            comment = next(comments, None)
+        review = {
+            "id": review_id,
+            "text": text,
+            "author": author,
+            "score": score,
+            "pub_date": pub_date,
+            "comments": review_comments,
+        }
+        yield json.dumps(review, cls=JSONEncoder, ensure_ascii=False) + "\n"
@@ -1,20 +1,46 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Prefetch, Subquery, Value
+from django.db.models.functions import Lower
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from rest_framework import filters, status, viewsets
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework import filters, generics, status, viewsets
+from rest_framework.decorators import (
+    action,
+    api_view,
+    permission_classes,
+    throttle_classes,
+)
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import (
     AllowAny,
     IsAuthenticated,
     IsAuthenticatedOrReadOnly,
 )
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
-from reviews.models import Category, Genre, Title
+from rest_framework.settings import api_settings
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    Review,
+    Title,
+    TitleRanking,
+    TitleRatingStats,
+)
 
-from .filters import TitleFilter
-from .mixins import ModelViewSetWithoutPut, ModelViewSetWithoutRetrieve
+from .authentication import get_access_token, get_user_instance
+from .filters import NameIndexSearchFilter, TitleFilter
+from .mixins import (
+    ConditionalGetMixin,
+    ModelViewSetWithoutPut,
+    ModelViewSetWithoutRetrieve,
+    ResponseCacheMixin,
+    ResponseCacheRetrieveMixin,
+)
+from .pagination import LimitOffsetOrCursorPagination
 from .permissions import (
     AdminOnly,
     AdminOnlyOrReadOnly,
@@ -25,49 +51,88 @@ from .serializers import (
     CommentSerializer,
     GenreSerializer,
     ReviewSerializer,
+    ReviewWithCommentsSerializer,
     TitleGetSerializer,
     TitlePostSerializer,
+    TitleRankingSerializer,
+    TitleRatingStatsSerializer,
     TokenSerializer,
+    UserCommentSerializer,
     UserCreateSerializer,
+    UserReviewSerializer,
     UserSerializer,
 )
-from .utils import send_confirmation_code
+from .throttling import AUTH_THROTTLES
+from .utils import iter_title_export, send_confirmation_code
 
 User = get_user_model()
 
 
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@throttle_classes(AUTH_THROTTLES)
 def get_confirmation_code(request):
     """Получить код подтверждения на указанный email"""
     serializer = UserCreateSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    email = serializer.validated_data.get("email")
-    username = serializer.validated_data.get("username")
-    try:
-        user, exist = User.objects.get_or_create(
-            username=username, email=email
-        )
-    except Exception:
-        return Response(request.data, status=status.HTTP_400_BAD_REQUEST)
+    user = get_signup_user(
+        serializer.validated_data["username"],
+        serializer.validated_data["email"],
+    )
     confirmation_code = default_token_generator.make_token(user)
-    send_confirmation_code(email, confirmation_code)
+    send_confirmation_code(user.email, confirmation_code)
     return Response(request.data, status=status.HTTP_200_OK)
 
 
+def get_signup_user(username, email):
+    """Пользователь для регистрации: найденный без учёта регистра или новый.
+
+    Совпадение только username или только email - ошибка по этому полю.
+    Вставку, проигравшую гонку параллельной регистрации, отсекают
+    уникальные индексы, и пользователь ищется повторно.
+    """
+    for attempt in range(2):
+        matches = list(User.find_casefold(username, email)[:2])
+        for user in matches:
+            if user.same_username and user.same_email:
+                return user
+        errors = {}
+        if any(user.same_username for user in matches):
+            errors["username"] = [
+                "Пользователь с таким username зарегистрирован "
+                "с другим email."
+            ]
+        if any(user.same_email for user in matches):
+            errors["email"] = [
+                "Этот email уже используется другим пользователем."
+            ]
+        if errors:
+            raise ValidationError(errors)
+        try:
+            with transaction.atomic():
+                return User.objects.create(username=username, email=email)
+        except IntegrityError:
+            if attempt:
+                raise
+
+
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@throttle_classes(AUTH_THROTTLES)
 def get_token(request):
     """Получить токен для работы с API по коду подтверждения"""
     serializer = TokenSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     username = serializer.validated_data.get("username")
     confirmation_code = serializer.validated_data.get("confirmation_code")
-    user = get_object_or_404(User, username=username)
+    user = get_object_or_404(
+        User.objects.annotate(username_ci=Lower("username")),
+        username_ci=Lower(Value(username)),
+    )
     if not default_token_generator.check_token(user, confirmation_code):
         message = {"confirmation_code": "Кот подтверждения неверен"}
         return Response(message, status=status.HTTP_400_BAD_REQUEST)
-    message = {"token": AccessToken.for_user(user)}
+    message = {"token": str(get_access_token(user))}
     return Response(message, status=status.HTTP_200_OK)
 
 
@@ -78,6 +143,9 @@ class UserViewSet(ModelViewSetWithoutPut):
     filter_backends = (filters.SearchFilter,)
     search_fields = ("username",)
     lookup_field = "username"
+    # Порядок лент me/reviews и me/comments.
+    cursor_ordering = ("-pub_date", "-id")
+    count_cache_per_user = False
 
     @action(
         methods=["GET", "PATCH"],
@@ -86,19 +154,66 @@ class UserViewSet(ModelViewSetWithoutPut):
     )
     def me(self, request):
         if request.method == "PATCH":
-            serializer = UserSerializer(
-                request.user, data=request.data, partial=True
-            )
+            # Строка сохраняется целиком, поэтому берётся из базы, а не
+            # из кэша: иначе запишутся устаревшие роль и флаги.
+            user = User.objects.get(pk=request.user.pk)
+            serializer = UserSerializer(user, data=request.data, partial=True)
             serializer.is_valid(raise_exception=True)
-            serializer.save(role=request.user.role)
+            serializer.save(role=user.role)
             return Response(serializer.data, status=status.HTTP_200_OK)
-        serializer = UserSerializer(request.user)
+        serializer = UserSerializer(get_user_instance(request.user))
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    def paginated_feed(self, queryset, serializer_class):
+        # Лента идёт по индексу (author, -pub_date, -id) в этом же порядке.
+        page = self.paginate_queryset(queryset.order_by(*self.cursor_ordering))
+        return self.get_paginated_response(
+            serializer_class(page, many=True).data
+        )
+
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="me/reviews",
+        permission_classes=(IsAuthenticated,),
+        pagination_class=LimitOffsetOrCursorPagination,
+        count_cache_per_user=True,
+    )
+    def my_reviews(self, request):
+        """Отзывы текущего пользователя ко всем произведениям."""
+        return self.paginated_feed(
+            Review.objects.filter(author_id=request.user.pk).select_related(
+                "author"
+            ),
+            UserReviewSerializer,
+        )
+
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="me/comments",
+        permission_classes=(IsAuthenticated,),
+        pagination_class=LimitOffsetOrCursorPagination,
+        count_cache_per_user=True,
+    )
+    def my_comments(self, request):
+        """Комментарии текущего пользователя ко всем отзывам."""
+        return self.paginated_feed(
+            Comment.objects.filter(author_id=request.user.pk)
+            .select_related("author")
+            .annotate(title=F("review__title_id")),
+            UserCommentSerializer,
+        )
+
 
-class TitleViewSet(ModelViewSetWithoutPut):
+class TitleViewSet(
+    ConditionalGetMixin, ResponseCacheRetrieveMixin, ModelViewSetWithoutPut
+):
     permission_classes = (AdminOnlyOrReadOnly,)
+    cache_models = ("title", "genre", "category", "review")
     filterset_class = TitleFilter
+    pagination_class = LimitOffsetOrCursorPagination
+    cursor_ordering = ("-id",)
 
     def get_serializer_class(self):
         if self.action in ("list", "retrieve"):
@@ -107,58 +222,260 @@ class TitleViewSet(ModelViewSetWithoutPut):
 
     def get_queryset(self):
         if self.action in ("list", "retrieve"):
-            return Title.objects.annotate(rating=Avg("reviews__score"))
+            return Title.objects.select_related("category").prefetch_related(
+                "genre"
+            )
         return Title.objects.all()
 
+    def get_validators(self):
+        return self.get_versions_validators(self.cache_models)
+
+    @action(methods=["GET"], detail=False)
+    def leaderboard(self, request):
+        """Лучшие произведения по байесовскому рейтингу.
+
+        Без параметров - общая таблица, ``?category=<slug>`` или
+        ``?genre=<slug>`` - таблица категории или жанра.
+        """
+        category = request.query_params.get("category")
+        genre = request.query_params.get("genre")
+        if category and genre:
+            raise ValidationError(
+                "Укажите либо категорию, либо жанр, но не оба сразу."
+            )
+        if category:
+            rankings = TitleRanking.objects.filter(
+                category__slug=category, genre=None
+            )
+        elif genre:
+            rankings = TitleRanking.objects.filter(
+                category=None, genre__slug=genre
+            )
+        else:
+            rankings = TitleRanking.objects.filter(category=None, genre=None)
+        rankings = rankings.select_related(
+            "title__category"
+        ).prefetch_related("title__genre")
+        self.cursor_ordering = ("-score", "title")
+        page = self.paginate_queryset(rankings)
+        serializer = TitleRankingSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(methods=["GET"], detail=True, url_path="rating-stats")
+    def rating_stats(self, request, pk=None):
+        """Распределение оценок произведения по счётчикам."""
+        # get_object_or_404 из DRF отвечает 404 и на нечисловой pk.
+        try:
+            stats = generics.get_object_or_404(TitleRatingStats, title_id=pk)
+        except Http404:
+            title = generics.get_object_or_404(Title, pk=pk)
+            stats = TitleRatingStats(title=title)
+        return Response(TitleRatingStatsSerializer(stats).data)
+
+    @action(methods=["GET"], detail=True)
+    def export(self, request, pk=None):
+        """Все отзывы произведения с комментариями потоком NDJSON."""
+        title = generics.get_object_or_404(Title.objects.only("pk"), pk=pk)
+        return StreamingHttpResponse(
+            iter_title_export(title.pk),
+            content_type="application/x-ndjson; charset=utf-8",
+        )
 
-class CategoryViewSet(ModelViewSetWithoutRetrieve):
+    @action(methods=["POST"], detail=False, url_path="bulk")
+    def bulk_create(self, request):
+        """Создать пачку произведений, вернуть результат по каждому."""
+        if not isinstance(request.data, list):
+            raise ValidationError("Ожидается список произведений.")
+        if len(request.data) > settings.TITLES_BULK_CREATE_LIMIT:
+            raise ValidationError(
+                "Не больше "
+                f"{settings.TITLES_BULK_CREATE_LIMIT} произведений за раз."
+            )
+        context = self.get_serializer_context()
+        context["slug_lookup"] = TitlePostSerializer.get_slug_lookup(
+            request.data
+        )
+        candidates = [
+            TitlePostSerializer(data=item, context=context)
+            for item in request.data
+        ]
+        valid = [
+            serializer for serializer in candidates if serializer.is_valid()
+        ]
+        titles = TitlePostSerializer.bulk_create(
+            [serializer.validated_data for serializer in valid]
+        )
+        for serializer, title in zip(valid, titles):
+            serializer.instance = title
+        results = []
+        for serializer in candidates:
+            if serializer.instance is None:
+                results.append(
+                    {
+                        "status": status.HTTP_400_BAD_REQUEST,
+                        "errors": serializer.errors,
+                    }
+                )
+                continue
+            results.append(
+                {
+                    "status": status.HTTP_201_CREATED,
+                    "data": serializer.to_representation(
+                        {
+                            "id": serializer.instance.pk,
+                            **serializer.validated_data,
+                        }
+                    ),
+                }
+            )
+        return Response(
+            results,
+            status=status.HTTP_201_CREATED
+            if titles
+            else status.HTTP_400_BAD_REQUEST,
+        )
+
+
+class CategoryViewSet(ResponseCacheMixin, ModelViewSetWithoutRetrieve):
     permission_classes = (AdminOnlyOrReadOnly,)
+    cache_models = ("category",)
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     lookup_field = "slug"
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ("name",)
+    filter_backends = (NameIndexSearchFilter,)
 
 
-class GenreViewSet(ModelViewSetWithoutRetrieve):
+class GenreViewSet(ResponseCacheMixin, ModelViewSetWithoutRetrieve):
     permission_classes = (AdminOnlyOrReadOnly,)
+    cache_models = ("genre",)
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     lookup_field = "slug"
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ("name",)
+    filter_backends = (NameIndexSearchFilter,)
 
 
-class ReviewViewSet(ModelViewSetWithoutPut):
+class ReviewViewSet(ConditionalGetMixin, ModelViewSetWithoutPut):
     serializer_class = ReviewSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, AuthorOrModeratorOrAdmin]
+    pagination_class = LimitOffsetOrCursorPagination
+    cursor_ordering = ("-pub_date", "-id")
+    comments_preview_param = "comments_preview"
+    max_comments_preview = 10
 
     def get_parent_title(self):
-        return get_object_or_404(Title, pk=int(self.kwargs.get("title_id")))
+        # Представление живёт один запрос: произведение читается один раз
+        # для валидаторов, выборки и создания отзыва.
+        if not hasattr(self, "_parent_title"):
+            self._parent_title = get_object_or_404(
+                Title, pk=int(self.kwargs.get("title_id"))
+            )
+        return self._parent_title
+
+    def get_comments_preview(self):
+        """Сколько последних комментариев показать у отзыва, либо None."""
+        value = self.request.query_params.get(self.comments_preview_param)
+        if value is None or self.action not in ("list", "retrieve"):
+            return None
+        if not value.isdigit() or int(value) > self.max_comments_preview:
+            raise ValidationError(
+                {
+                    self.comments_preview_param: [
+                        "Ожидается целое число от 0 до "
+                        f"{self.max_comments_preview}."
+                    ]
+                }
+            )
+        return int(value)
+
+    def get_serializer_class(self):
+        if self.get_comments_preview() is not None:
+            return ReviewWithCommentsSerializer
+        return ReviewSerializer
 
     def get_queryset(self):
         title = self.get_parent_title()
-        return title.reviews.all()
+        queryset = title.reviews.select_related("author")
+        preview = self.get_comments_preview()
+        if preview is None:
+            return queryset
+        queryset = queryset.annotate(comments_count=Count("comments"))
+        if not preview:
+            return queryset
+        # Последние комментарии всех отзывов страницы одним запросом:
+        # для каждого комментария проверяется, что он в первых N своего
+        # отзыва.
+        latest = (
+            Comment.objects.filter(review=OuterRef("review"))
+            .order_by("-pub_date", "-id")
+            .values("pk")[:preview]
+        )
+        return queryset.prefetch_related(
+            Prefetch(
+                "comments",
+                queryset=Comment.objects.filter(pk__in=Subquery(latest))
+                .select_related("author")
+                .order_by("-pub_date", "-id"),
+                to_attr="latest_comments",
+            )
+        )
+
+    def get_validators(self):
+        title = self.get_parent_title()
+        versions = [f"title-reviews:{title.pk}"]
+        if self.get_comments_preview() is not None:
+            versions.append(Comment._meta.model_name)
+        return self.get_versions_validators(versions, title.reviews.all())
 
     def perform_create(self, serializer):
         title = self.get_parent_title()
-        serializer.save(author=self.request.user, title=title)
+        author = get_user_instance(self.request.user)
+        try:
+            with transaction.atomic():
+                serializer.save(author=author, title=title)
+        except IntegrityError:
+            # Повтор отзыва ловит ограничение unique_review, без
+            # отдельной проверки exists() перед вставкой; остальные
+            # ошибки целостности не выдаются за повтор.
+            if not Review.objects.filter(author=author, title=title).exists():
+                raise
+            raise ValidationError(
+                {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        ReviewSerializer.duplicate_message
+                    ]
+                }
+            )
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = (IsAuthenticatedOrReadOnly, AuthorOrModeratorOrAdmin)
+    pagination_class = LimitOffsetOrCursorPagination
+    cursor_ordering = ("-pub_date", "-id")
 
     def get_parent_review(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
-        return get_object_or_404(
-            title.reviews.all(), pk=self.kwargs.get("review_id")
-        )
+        # Один запрос на пару произведение-отзыв: отзыв ищется по pk
+        # в пределах title_id, несуществующее произведение тоже даёт 404.
+        if not hasattr(self, "_parent_review"):
+            self._parent_review = get_object_or_404(
+                Review,
+                pk=self.kwargs.get("review_id"),
+                title_id=self.kwargs.get("title_id"),
+            )
+        return self._parent_review
 
     def get_queryset(self):
         review = self.get_parent_review()
-        return review.comments.all()
+        return review.comments.select_related("author")
+
+    def get_validators(self):
+        review = self.get_parent_review()
+        return self.get_versions_validators(
+            [f"review-comments:{review.pk}"], review.comments.all()
+        )
 
     def perform_create(self, serializer):
         review = self.get_parent_review()
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(
+            author=get_user_instance(self.request.user), review=review
+        )
@@ -108,21 +108,38 @@ CSV_FILES_DIR = os.path.join(BASE_DIR, 'static/data')
 
 AUTH_USER_MODEL = "users.User"
 
+# Версии данных для кэша ответов и ETag хранятся в кэше по умолчанию и
+# должны быть общими для всех процессов сервера. С LocMemCache кэш ответов
+# и условные GET отключаются.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv(
+            "CACHE_LOCATION", os.path.join(BASE_DIR, "cache")
+        ),
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    }
+}
+
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.v1.authentication.ClaimsJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
+    "DEFAULT_PAGINATION_CLASS": "api.v1.pagination.CachedCountPagination",
     "PAGE_SIZE": 5,
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend"
     ],
+    # Число доверенных прокси перед приложением. При 0 адрес клиента для
+    # ограничений частоты берётся из REMOTE_ADDR, и X-Forwarded-For,
+    # который клиент может подделать, не учитывается.
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", 0)),
 }
 
 SIMPLE_JWT = {
@@ -134,6 +151,28 @@ SIMPLE_JWT = {
 LENGTH_TEXT = 20
 LIST_PER_PAGE = 20
 
+PAGINATION_COUNT_THRESHOLD = 1000
+PAGINATION_COUNT_CACHE_TIMEOUT = 60
+RESPONSE_CACHE_TIMEOUT = 300
+TITLES_BULK_CREATE_LIMIT = 10000
+LEADERBOARD_PRIOR_WEIGHT = 10
+LEADERBOARD_MEAN_TIMEOUT = 3600
+EXPORT_CHUNK_SIZE = 2000
+USER_CACHE_SIZE = 1024
+USER_CACHE_TIMEOUT = 60
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_DELAY = 60
+OUTBOX_IDLE_INTERVAL = 1
+# Ставки корзин токенов для auth/signup и auth/token: ёмкость/период.
+AUTH_RATE_LIMITS = {
+    "auth-ip": "30/min",
+    "auth-email": "5/min",
+    "auth-username": "5/min",
+}
+AUTH_RATE_LIMIT_BACKEND = "memory"
+AUTH_RATE_LIMIT_CACHE = "default"
+
 USER = "user"
 MODERATOR = "moderator"
 ADMIN = "admin"
@@ -7,6 +7,7 @@ from reviews.models import (
     Genre,
     Review,
     Title,
+    TitleRatingStats,
 )
 
 
@@ -54,6 +55,14 @@ class ReviewAdmin(admin.ModelAdmin):
     search_fields = ("author",)
 
 
+@admin.register(TitleRatingStats)
+class TitleRatingStatsAdmin(admin.ModelAdmin):
+    """Просмотр гистограмм оценок произведений."""
+
+    list_display = ("title", "total", "mean")
+    list_per_page = settings.LIST_PER_PAGE
+
+
 @admin.register(Title)
 class TitleAdmin(admin.ModelAdmin):
     """Настройка раздела произведений."""
@@ -64,6 +73,7 @@ class TitleAdmin(admin.ModelAdmin):
         "year",
         "description",
         "category",
+        "reviews_count",
     )
     empty_value_display = "-пусто-"
     list_filter = ("name",)
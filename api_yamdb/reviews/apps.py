@@ -6,3 +6,6 @@ class ReviewsConfig(AppConfig):
     name = "reviews"
     verbose_name = "Рецензия"
     verbose_name_plural = "Рецензии"
+
+    def ready(self):
+        from . import signals  # noqa: F401
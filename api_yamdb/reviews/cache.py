@@ -0,0 +1,49 @@
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+
+VERSION_KEY = "cache-version:{}"
+# Кэши, которые каждый процесс держит у себя.
+LOCAL_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def versions_are_shared():
+    """Видят ли все процессы одни и те же версии данных.
+
+    Версии лежат в кэше по умолчанию. Если он свой у каждого процесса,
+    изменение в одном процессе не сбрасывает данные, закэшированные
+    другими.
+    """
+    return settings.CACHES["default"]["BACKEND"] not in LOCAL_BACKENDS
+
+
+def new_version():
+    # Версия - время изменения в наносекундах: она не повторяет старые,
+    # даже если ключ был вытеснен из кэша, и годится для Last-Modified.
+    return time.time_ns()
+
+
+def get_cache_versions(names):
+    """Возвращает текущие версии перечисленных наборов данных."""
+    keys = [VERSION_KEY.format(name) for name in names]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            version = new_version()
+            cache.add(key, version, None)
+            versions[key] = cache.get(key, version)
+    return [versions[key] for key in keys]
+
+
+def bump_cache_version(name):
+    """Делает устаревшими все закэшированные данные набора."""
+    cache.set(VERSION_KEY.format(name), new_version(), None)
+
+
+def version_to_datetime(version):
+    return datetime.fromtimestamp(version / 10**9, tz=timezone.utc)
@@ -0,0 +1,213 @@
+import csv
+import json
+import os
+from collections import Counter, defaultdict
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.management import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+
+from reviews.cache import bump_cache_version
+from reviews.models import Review, Title
+from reviews.ranking import refresh_title_ranking, update_title_ranking_score
+from reviews.signals import change_score_count, change_title_rating
+from users.models import User
+
+FIELDS = ("title_id", "author", "text", "score")
+SKIP = "skip"
+UPDATE = "update"
+
+
+def read_rows(path):
+    """Записи файла отзывов: CSV с заголовком или JSON Lines."""
+    with open(path, encoding="utf-8", newline="") as file:
+        if not path.endswith((".jsonl", ".ndjson")):
+            yield from csv.DictReader(file)
+            return
+        for line in file:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+
+
+def clean_row(row):
+    """Проверяет запись теми же валидаторами, что и модель отзыва."""
+    if not isinstance(row, dict):
+        raise ValidationError("Запись не является объектом.")
+    missing = [name for name in FIELDS if row.get(name) in (None, "")]
+    if missing:
+        raise ValidationError(f"Не заполнены поля: {', '.join(missing)}.")
+    fields = {field.name: field for field in Review._meta.fields}
+    return (
+        fields["title"].to_python(row["title_id"]),
+        fields["author"].to_python(row["author"]),
+        fields["text"].clean(row["text"], None),
+        fields["score"].clean(row["score"], None),
+    )
+
+
+def apply_rating_changes(rating, histogram):
+    """Сдвигает счётчики, гистограммы и таблицы лидеров произведений.
+
+    bulk-операции не отправляют сигналы, поэтому рейтинг каждого
+    затронутого произведения меняется здесь одним изменением на пачку.
+    """
+    for title_id, (score_delta, count_delta) in rating.items():
+        if score_delta or count_delta:
+            change_title_rating(title_id, score_delta, count_delta)
+            if not update_title_ranking_score(title_id):
+                refresh_title_ranking(title_id)
+    for (title_id, score), delta in histogram.items():
+        if delta:
+            change_score_count(title_id, score, delta)
+
+
+class Command(BaseCommand):
+    """Массовый импорт отзывов."""
+
+    help = (
+        "Импортирует отзывы из CSV или JSON Lines (поля title_id, author, "
+        "text, score) пачками, каждая в своей транзакции."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Путь к файлу с отзывами.")
+        parser.add_argument(
+            "--on-conflict",
+            choices=(SKIP, UPDATE),
+            default=SKIP,
+            help="Что делать с уже существующим отзывом автора.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Число записей в одной транзакции.",
+        )
+
+    def handle(self, *args, **options):
+        if not os.path.isfile(options["path"]):
+            raise CommandError(f"Файл {options['path']} не найден.")
+        if options["batch_size"] < 1:
+            raise CommandError("Размер пачки должен быть положительным.")
+        report = Counter()
+        rows = enumerate(read_rows(options["path"]), 1)
+        for batch in iter(
+            lambda: list(islice(rows, options["batch_size"])), []
+        ):
+            self.import_batch(batch, options["on_conflict"], report)
+        self.stdout.write(
+            f"Создано отзывов: {report['created']}, "
+            f"обновлено: {report['updated']}, "
+            f"пропущено: {report['skipped']}, "
+            f"отклонено: {report['rejected']}, "
+            f"не записано из-за ошибок: {report['failed']}."
+        )
+
+    def reject(self, report, number, message):
+        report["rejected"] += 1
+        self.stderr.write(f"Запись {number}: {message}")
+
+    def import_batch(self, batch, policy, report):
+        reviews = self.clean_batch(batch, policy, report)
+        to_create, to_update, rating, histogram = self.split_batch(
+            reviews, policy, report
+        )
+        if not rating:
+            return
+        try:
+            with transaction.atomic():
+                Review.objects.bulk_create(to_create)
+                Review.objects.bulk_update(to_update, ["text", "score"])
+                apply_rating_changes(rating, histogram)
+        except IntegrityError as error:
+            report["failed"] += len(to_create) + len(to_update)
+            self.stderr.write(
+                f"Записи {batch[0][0]}-{batch[-1][0]} не записаны: {error}."
+            )
+            return
+        report["created"] += len(to_create)
+        report["updated"] += len(to_update)
+        bump_cache_version(Review._meta.model_name)
+        for title_id in rating:
+            bump_cache_version(f"title-reviews:{title_id}")
+
+    def clean_batch(self, batch, policy, report):
+        """Проверенные отзывы пачки по ключу (произведение, автор)."""
+        reviews = {}
+        for number, row in batch:
+            try:
+                title_id, author_id, text, score = clean_row(row)
+            except ValidationError as error:
+                self.reject(report, number, " ".join(error.messages))
+                continue
+            key = (title_id, author_id)
+            if key in reviews and policy == SKIP:
+                report["skipped"] += 1
+                continue
+            reviews[key] = (
+                number,
+                Review(
+                    title_id=title_id,
+                    author_id=author_id,
+                    text=text,
+                    score=score,
+                ),
+            )
+        return reviews
+
+    def split_batch(self, reviews, policy, report):
+        """Делит отзывы на новые и обновляемые, считает сдвиги рейтинга.
+
+        Произведения и авторы всей пачки проверяются двумя запросами,
+        существующие отзывы - третьим.
+        """
+        title_ids = {title_id for title_id, _ in reviews}
+        author_ids = {author_id for _, author_id in reviews}
+        titles = set(
+            Title.objects.filter(pk__in=title_ids).values_list(
+                "pk", flat=True
+            )
+        )
+        authors = set(
+            User.objects.filter(pk__in=author_ids).values_list(
+                "pk", flat=True
+            )
+        )
+        existing = {
+            (title_id, author_id): (pk, score)
+            for pk, title_id, author_id, score in Review.objects.filter(
+                title_id__in=titles, author_id__in=authors
+            ).values_list("pk", "title_id", "author_id", "score")
+        }
+
+        to_create, to_update = [], []
+        rating = defaultdict(lambda: [0, 0])
+        histogram = Counter()
+        for (title_id, author_id), (number, review) in reviews.items():
+            if title_id not in titles:
+                self.reject(
+                    report, number, f"Произведение {title_id} не найдено."
+                )
+            elif author_id not in authors:
+                self.reject(
+                    report, number, f"Пользователь {author_id} не найден."
+                )
+            elif (title_id, author_id) not in existing:
+                to_create.append(review)
+                rating[title_id][0] += review.score
+                rating[title_id][1] += 1
+                histogram[title_id, review.score] += 1
+            elif policy == UPDATE:
+                review.pk, old_score = existing[title_id, author_id]
+                to_update.append(review)
+                rating[title_id][0] += review.score - old_score
+                histogram[title_id, old_score] -= 1
+                histogram[title_id, review.score] += 1
+            else:
+                report["skipped"] += 1
+        return to_create, to_update, rating, histogram
@@ -0,0 +1,132 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from reviews.cache import bump_cache_version
+from reviews.models import Review, Title, TitleRatingStats
+from reviews.ranking import rebuild_rankings
+
+
+def actual_rating_counters():
+    """Подзапросы с фактическими суммой оценок и числом отзывов."""
+    reviews = Review.objects.filter(title=OuterRef("pk")).values("title")
+    return {
+        "actual_sum": Coalesce(
+            Subquery(reviews.annotate(total=Sum("score")).values("total")),
+            0,
+        ),
+        "actual_count": Coalesce(
+            Subquery(reviews.annotate(total=Count("pk")).values("total")),
+            0,
+        ),
+    }
+
+
+def bump_rating_versions():
+    """Сбрасывает кэш ответов и ETag с рейтингом произведений.
+
+    Счётчики переписываются запросом UPDATE без сигналов, поэтому версии
+    меняются здесь.
+    """
+    bump_cache_version(Title._meta.model_name)
+    bump_cache_version(Review._meta.model_name)
+    for title_id in Title.objects.values_list("pk", flat=True).iterator():
+        bump_cache_version(f"title-reviews:{title_id}")
+
+
+def actual_rating_stats():
+    """Фактические гистограммы оценок: {title_id: {оценка: число}}."""
+    stats = {}
+    counts = (
+        Review.objects.filter(score__in=TitleRatingStats.SCORES)
+        .values_list("title_id", "score")
+        .annotate(total=Count("pk"))
+        .order_by()
+    )
+    for title_id, score, total in counts:
+        stats.setdefault(title_id, {})[score] = total
+    return stats
+
+
+class Command(BaseCommand):
+    """Пересчёт денормализованного рейтинга произведений."""
+
+    help = (
+        "Пересчитывает счётчики рейтинга произведений по отзывам "
+        "и таблицы лидеров."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Только проверить согласованность счётчиков.",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            return self.check_counters()
+        counters = actual_rating_counters()
+        with transaction.atomic():
+            updated = Title.objects.update(
+                score_sum=counters["actual_sum"],
+                reviews_count=counters["actual_count"],
+            )
+            TitleRatingStats.objects.all().delete()
+            TitleRatingStats.objects.bulk_create(
+                (
+                    TitleRatingStats(
+                        title_id=title_id,
+                        **{
+                            f"score_{score}": total
+                            for score, total in scores.items()
+                        },
+                    )
+                    for title_id, scores in actual_rating_stats().items()
+                ),
+                batch_size=500,
+            )
+            rebuild_rankings()
+            transaction.on_commit(bump_rating_versions)
+        self.stdout.write(f"Пересчитан рейтинг {updated} произведений.")
+
+    def check_counters(self):
+        broken = (
+            Title.objects.annotate(**actual_rating_counters())
+            .filter(
+                ~Q(score_sum=F("actual_sum"))
+                | ~Q(reviews_count=F("actual_count"))
+            )
+            .values_list("pk", "score_sum", "actual_sum",
+                         "reviews_count", "actual_count")
+        )
+        broken = list(broken)
+        for pk, score_sum, actual_sum, count, actual_count in broken:
+            self.stderr.write(
+                f"Произведение {pk}: сумма {score_sum} (ожидалось "
+                f"{actual_sum}), отзывов {count} (ожидалось {actual_count})."
+            )
+        actual = actual_rating_stats()
+        for stats in TitleRatingStats.objects.iterator():
+            expected = actual.pop(stats.title_id, {})
+            scores = {
+                score: count for score, count in stats.scores.items() if count
+            }
+            if scores != expected:
+                broken.append(stats.title_id)
+                self.stderr.write(
+                    f"Произведение {stats.title_id}: гистограмма {scores} "
+                    f"(ожидалось {expected})."
+                )
+        for title_id, expected in actual.items():
+            broken.append(title_id)
+            self.stderr.write(
+                f"Произведение {title_id}: нет гистограммы "
+                f"(ожидалось {expected})."
+            )
+        if broken:
+            raise CommandError(
+                f"Найдено расхождений в рейтинге: {len(broken)}."
+            )
+        self.stdout.write("Рейтинг всех произведений согласован.")
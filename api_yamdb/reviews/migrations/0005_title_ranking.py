@@ -0,0 +1,65 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+
+# Вес априорного среднего на момент миграции, далее используется
+# LEADERBOARD_PRIOR_WEIGHT из настроек.
+PRIOR_WEIGHT = 10
+
+
+def fill_rankings(apps, schema_editor):
+    Title = apps.get_model("reviews", "Title")
+    TitleRanking = apps.get_model("reviews", "TitleRanking")
+    totals = Title.objects.aggregate(
+        score_sum=Sum("score_sum"), reviews_count=Sum("reviews_count")
+    )
+    if not totals["reviews_count"]:
+        return
+    mean = totals["score_sum"] / totals["reviews_count"]
+    rankings = []
+    for title in Title.objects.filter(reviews_count__gt=0):
+        score = (title.score_sum + PRIOR_WEIGHT * mean) / (
+            title.reviews_count + PRIOR_WEIGHT
+        )
+        rankings.append(TitleRanking(title=title, score=score))
+        if title.category_id:
+            rankings.append(
+                TitleRanking(
+                    title=title, category_id=title.category_id, score=score
+                )
+            )
+        rankings.extend(
+            TitleRanking(title=title, genre=genre, score=score)
+            for genre in title.genre.all()
+        )
+    TitleRanking.objects.bulk_create(rankings, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_title_rating_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='Взвешенный рейтинг')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.category', verbose_name='Категория')),
+                ('genre', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.genre', verbose_name='Жанр')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Место в рейтинге',
+                'verbose_name_plural': 'Места в рейтинге',
+                'ordering': ('-score', 'title'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['category', 'genre', '-score', 'title'], name='ranking_scope_score_idx'),
+        ),
+        migrations.RunPython(fill_rankings, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,7 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core import validators
-from django.db import models
+from django.db import models, transaction
 
 from .validators import validate_year
 
@@ -95,6 +95,16 @@ class Title(models.Model):
         blank=True,
         verbose_name="Категории произведения",
     )
+    score_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Сумма оценок",
+    )
+    reviews_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Количество отзывов",
+    )
 
     class Meta:
         verbose_name = "Произведение"
@@ -104,6 +114,115 @@ class Title(models.Model):
     def __str__(self):
         return f"{self.name}"
 
+    @property
+    def rating(self):
+        """Средняя оценка по денормализованным счётчикам отзывов."""
+        if not self.reviews_count:
+            return None
+        return self.score_sum / self.reviews_count
+
+
+class TitleRatingStats(models.Model):
+    """Гистограмма оценок произведения.
+
+    Одна строка на произведение, счётчики сдвигаются сигналами отзывов.
+    """
+
+    SCORES = range(1, 11)
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="rating_stats",
+        verbose_name="Произведение",
+    )
+    score_1 = models.PositiveIntegerField(default=0, verbose_name="Оценок 1")
+    score_2 = models.PositiveIntegerField(default=0, verbose_name="Оценок 2")
+    score_3 = models.PositiveIntegerField(default=0, verbose_name="Оценок 3")
+    score_4 = models.PositiveIntegerField(default=0, verbose_name="Оценок 4")
+    score_5 = models.PositiveIntegerField(default=0, verbose_name="Оценок 5")
+    score_6 = models.PositiveIntegerField(default=0, verbose_name="Оценок 6")
+    score_7 = models.PositiveIntegerField(default=0, verbose_name="Оценок 7")
+    score_8 = models.PositiveIntegerField(default=0, verbose_name="Оценок 8")
+    score_9 = models.PositiveIntegerField(default=0, verbose_name="Оценок 9")
+    score_10 = models.PositiveIntegerField(
+        default=0, verbose_name="Оценок 10"
+    )
+
+    class Meta:
+        verbose_name = "Статистика оценок"
+        verbose_name_plural = "Статистика оценок"
+
+    def __str__(self):
+        return f"{self.title_id}"
+
+    @property
+    def scores(self):
+        return {
+            score: getattr(self, f"score_{score}") for score in self.SCORES
+        }
+
+    @property
+    def total(self):
+        return sum(self.scores.values())
+
+    @property
+    def mean(self):
+        if not self.total:
+            return None
+        return (
+            sum(score * count for score, count in self.scores.items())
+            / self.total
+        )
+
+
+class TitleRanking(models.Model):
+    """Материализованный взвешенный рейтинг для таблиц лидеров.
+
+    У произведения с отзывами есть общая строка (без категории и жанра),
+    строка его категории и по строке на каждый жанр, поэтому любая таблица
+    лидеров читается диапазоном одного индекса.
+    """
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name="rankings",
+        verbose_name="Произведение",
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="Категория",
+    )
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="Жанр",
+    )
+    score = models.FloatField(verbose_name="Взвешенный рейтинг")
+
+    class Meta:
+        verbose_name = "Место в рейтинге"
+        verbose_name_plural = "Места в рейтинге"
+        ordering = ("-score", "title")
+        indexes = [
+            models.Index(
+                fields=("category", "genre", "-score", "title"),
+                name="ranking_scope_score_idx",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.title_id}: {self.score:.2f}"
+
 
 class Review(ReviewCommentBaseModel):
     """Модель отзыва к произведениям Title."""
@@ -141,11 +260,29 @@ class Review(ReviewCommentBaseModel):
                 fields=("title", "author"), name="unique_review"
             )
         ]
+        indexes = [
+            # Списки отзывов произведения и ленты пользователя идут по
+            # индексу без сортировки во временном дереве.
+            models.Index(
+                fields=("title", "-pub_date", "-id"),
+                name="review_title_pub_date_idx",
+            ),
+            models.Index(
+                fields=("author", "-pub_date", "-id"),
+                name="review_author_pub_date_idx",
+            ),
+        ]
         ordering = ("-pub_date",)
 
     def __str__(self):
         return f"{self.text[:settings.LENGTH_TEXT]}"
 
+    def save(self, *args, **kwargs):
+        # Счётчики рейтинга обновляются в post_save, поэтому сохранение
+        # отзыва и пересчёт должны попасть в одну транзакцию.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class Comment(ReviewCommentBaseModel):
     """Модель комментария к отзыву Review."""
@@ -171,6 +308,16 @@ class Comment(ReviewCommentBaseModel):
                 fields=("review", "author"), name="unique_comment"
             )
         ]
+        indexes = [
+            models.Index(
+                fields=("review", "-pub_date", "-id"),
+                name="comment_review_pub_date_idx",
+            ),
+            models.Index(
+                fields=("author", "-pub_date", "-id"),
+                name="comment_author_pub_date_idx",
+            ),
+        ]
         ordering = ("-pub_date",)
 
     def __str__(self):
@@ -0,0 +1,124 @@
+"""Байесовский рейтинг произведений для таблиц лидеров.
+
+Взвешенная оценка ``(v * R + m * C) / (v + m)`` тянет среднее ``R``
+произведения с ``v`` отзывами к общему среднему ``C`` с весом
+``m = LEADERBOARD_PRIOR_WEIGHT``: одна десятка не обгоняет тысячи девяток.
+Общее среднее берётся из кэша и пересчитывается раз в
+``LEADERBOARD_MEAN_TIMEOUT`` секунд; сдвиг ``C`` между пересчётами
+выравнивает команда ``rebuild_ratings``.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import ExpressionWrapper, FloatField, Subquery, Sum
+from django.db.models.functions import Cast
+
+from .models import Title, TitleRanking
+
+GLOBAL_MEAN_KEY = "leaderboard-global-mean"
+
+
+def get_global_mean():
+    mean = cache.get(GLOBAL_MEAN_KEY)
+    if mean is None:
+        totals = Title.objects.aggregate(
+            score_sum=Sum("score_sum"), reviews_count=Sum("reviews_count")
+        )
+        mean = 0.0
+        if totals["reviews_count"]:
+            mean = totals["score_sum"] / totals["reviews_count"]
+        cache.set(GLOBAL_MEAN_KEY, mean, settings.LEADERBOARD_MEAN_TIMEOUT)
+    return mean
+
+
+def weighted_rating(score_sum, reviews_count, mean):
+    weight = settings.LEADERBOARD_PRIOR_WEIGHT
+    return (score_sum + weight * mean) / (reviews_count + weight)
+
+
+def build_title_rankings(title, genre_ids, score):
+    """Строки рейтинга произведения во всех таблицах лидеров."""
+    rankings = [TitleRanking(title_id=title.pk, score=score)]
+    if title.category_id:
+        rankings.append(
+            TitleRanking(
+                title_id=title.pk, category_id=title.category_id, score=score
+            )
+        )
+    rankings.extend(
+        TitleRanking(title_id=title.pk, genre_id=genre_id, score=score)
+        for genre_id in genre_ids
+    )
+    return rankings
+
+
+def refresh_title_ranking(title):
+    """Пересобирает строки рейтинга произведения целиком.
+
+    Нужно при появлении первого отзыва и при смене категории или жанров.
+    Принимает произведение или его ``pk``; у переданного объекта берётся
+    только категория, счётчики читает ``update_title_ranking_score``.
+    """
+    title_id = getattr(title, "pk", title)
+    TitleRanking.objects.filter(title_id=title_id).delete()
+    if not isinstance(title, Title):
+        title = Title.objects.filter(pk=title_id).only("category_id").first()
+        if title is None:
+            return
+    genre_ids = Title.genre.through.objects.filter(
+        title_id=title_id
+    ).values_list("genre_id", flat=True)
+    TitleRanking.objects.bulk_create(
+        build_title_rankings(title, genre_ids, 0.0)
+    )
+    update_title_ranking_score(title_id)
+
+
+def update_title_ranking_score(title_id):
+    """Обновляет оценку в существующих строках рейтинга, возвращает их число.
+
+    Счётчики произведения читаются подзапросом в том же ``UPDATE``, строки
+    произведения без отзывов удаляются. Новые строки здесь не создаются:
+    при каскадном удалении произведения они ссылались бы на удаляемую
+    строку.
+    """
+    rankings = TitleRanking.objects.filter(title_id=title_id)
+    rankings.filter(title__reviews_count=0).delete()
+    counters = Title.objects.filter(pk=title_id)
+    weight = settings.LEADERBOARD_PRIOR_WEIGHT
+    return rankings.update(
+        score=ExpressionWrapper(
+            (
+                Cast(Subquery(counters.values("score_sum")), FloatField())
+                + weight * get_global_mean()
+            )
+            / (Subquery(counters.values("reviews_count")) + weight),
+            output_field=FloatField(),
+        )
+    )
+
+
+def rebuild_rankings():
+    """Пересчитывает все таблицы лидеров по свежему общему среднему."""
+    cache.delete(GLOBAL_MEAN_KEY)
+    mean = get_global_mean()
+    genres = {}
+    for title_id, genre_id in Title.genre.through.objects.values_list(
+        "title_id", "genre_id"
+    ):
+        genres.setdefault(title_id, []).append(genre_id)
+    titles = Title.objects.filter(reviews_count__gt=0).only(
+        "score_sum", "reviews_count", "category_id"
+    )
+    TitleRanking.objects.all().delete()
+    TitleRanking.objects.bulk_create(
+        (
+            ranking
+            for title in titles.iterator()
+            for ranking in build_title_rankings(
+                title,
+                genres.get(title.pk, ()),
+                weighted_rating(title.score_sum, title.reviews_count, mean),
+            )
+        ),
+        batch_size=500,
+    )
@@ -0,0 +1,96 @@
+"""Полнотекстовый индекс FTS5 по названию и описанию произведений.
+
+Индекс - внешняя таблица FTS5 над ``reviews_title``, которую синхронизируют
+триггеры SQLite, поэтому в неё попадают и массовые вставки в обход ORM.
+При пересоздании ``reviews_title`` (SQLite делает так для большинства
+изменений схемы) триггеры удаляются вместе со старой таблицей: миграции,
+меняющие ``Title``, должны снова вызвать ``create_title_search_index``.
+"""
+import re
+
+TITLE_SEARCH_TABLE = "reviews_title_fts"
+
+CREATE_TITLE_SEARCH_SQL = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {TITLE_SEARCH_TABLE} USING fts5(
+        name, description,
+        content='reviews_title', content_rowid='id',
+        tokenize='unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TITLE_SEARCH_TABLE}_insert
+    AFTER INSERT ON reviews_title BEGIN
+        INSERT INTO {TITLE_SEARCH_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TITLE_SEARCH_TABLE}_delete
+    AFTER DELETE ON reviews_title BEGIN
+        INSERT INTO {TITLE_SEARCH_TABLE}(
+            {TITLE_SEARCH_TABLE}, rowid, name, description
+        )
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {TITLE_SEARCH_TABLE}_update
+    AFTER UPDATE OF name, description ON reviews_title BEGIN
+        INSERT INTO {TITLE_SEARCH_TABLE}(
+            {TITLE_SEARCH_TABLE}, rowid, name, description
+        )
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {TITLE_SEARCH_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"""
+    INSERT INTO {TITLE_SEARCH_TABLE}({TITLE_SEARCH_TABLE}) VALUES ('rebuild')
+    """,
+)
+
+DROP_TITLE_SEARCH_SQL = (
+    f"DROP TRIGGER IF EXISTS {TITLE_SEARCH_TABLE}_insert",
+    f"DROP TRIGGER IF EXISTS {TITLE_SEARCH_TABLE}_delete",
+    f"DROP TRIGGER IF EXISTS {TITLE_SEARCH_TABLE}_update",
+    f"DROP TABLE IF EXISTS {TITLE_SEARCH_TABLE}",
+)
+
+TITLE_MATCH_SQL = (
+    f"SELECT rowid FROM {TITLE_SEARCH_TABLE} "
+    f"WHERE {TITLE_SEARCH_TABLE} MATCH %s"
+)
+# Совпадение в названии весит больше, чем в описании.
+TITLE_RANK_SQL = (
+    f"SELECT bm25({TITLE_SEARCH_TABLE}, 10.0, 1.0) "
+    f"FROM {TITLE_SEARCH_TABLE} "
+    f"WHERE {TITLE_SEARCH_TABLE} MATCH %s "
+    f"AND rowid = reviews_title.id"
+)
+
+
+def create_title_search_index(schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for sql in CREATE_TITLE_SEARCH_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_title_search_index(schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for sql in DROP_TITLE_SEARCH_SQL:
+        schema_editor.execute(sql)
+
+
+def build_match_query(value):
+    """Превращает пользовательский ввод в безопасный запрос FTS5.
+
+    Каждое слово ищется как префикс, чтобы поиск работал по мере набора;
+    синтаксис FTS5 из ввода не интерпретируется.
+    """
+    words = re.findall(r"\w+", value)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
@@ -0,0 +1,124 @@
+from django.db.models import F
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_init,
+    post_save,
+)
+from django.dispatch import receiver
+
+from .cache import bump_cache_version
+from .models import Category, Comment, Genre, Review, Title, TitleRatingStats
+from .ranking import refresh_title_ranking, update_title_ranking_score
+
+
+def change_title_rating(title_id, score_delta, count_delta):
+    """Атомарно сдвигает счётчики рейтинга произведения."""
+    Title.objects.filter(pk=title_id).update(
+        score_sum=F("score_sum") + score_delta,
+        reviews_count=F("reviews_count") + count_delta,
+    )
+
+
+def change_score_count(title_id, score, delta):
+    """Атомарно сдвигает счётчик оценки в гистограмме произведения."""
+    if score not in TitleRatingStats.SCORES:
+        return
+    field = f"score_{score}"
+    stats = TitleRatingStats.objects.filter(title_id=title_id)
+    if stats.update(**{field: F(field) + delta}) or delta < 0:
+        return
+    TitleRatingStats.objects.get_or_create(title_id=title_id)
+    stats.update(**{field: F(field) + delta})
+
+
+@receiver(post_init, sender=Review)
+def remember_review_score(sender, instance, **kwargs):
+    """Запоминает загруженные из базы оценку и произведение отзыва."""
+    instance._loaded_score = instance.__dict__.get("score")
+    instance._loaded_title_id = instance.__dict__.get("title_id")
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    if created:
+        change_title_rating(instance.title_id, instance.score, 1)
+        change_score_count(instance.title_id, instance.score, 1)
+        if not update_title_ranking_score(instance.title_id):
+            refresh_title_ranking(instance.title)
+    elif instance._loaded_title_id != instance.title_id:
+        change_title_rating(
+            instance._loaded_title_id, -instance._loaded_score, -1
+        )
+        change_title_rating(instance.title_id, instance.score, 1)
+        change_score_count(
+            instance._loaded_title_id, instance._loaded_score, -1
+        )
+        change_score_count(instance.title_id, instance.score, 1)
+        update_title_ranking_score(instance._loaded_title_id)
+        refresh_title_ranking(instance.title)
+    elif instance._loaded_score != instance.score:
+        change_title_rating(
+            instance.title_id, instance.score - instance._loaded_score, 0
+        )
+        change_score_count(instance.title_id, instance._loaded_score, -1)
+        change_score_count(instance.title_id, instance.score, 1)
+        update_title_ranking_score(instance.title_id)
+    instance._loaded_score = instance.score
+    instance._loaded_title_id = instance.title_id
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    change_title_rating(instance.title_id, -instance.score, -1)
+    change_score_count(instance.title_id, instance.score, -1)
+    update_title_ranking_score(instance.title_id)
+
+
+@receiver(post_save, sender=Title)
+def refresh_ranking_on_title_save(sender, instance, created, **kwargs):
+    # У нового произведения нет отзывов, а значит и строк рейтинга.
+    if not created:
+        refresh_title_ranking(instance)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_model_cache_version(sender, **kwargs):
+    bump_cache_version(sender._meta.model_name)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_title_genre_cache_version(sender, action, **kwargs):
+    if action.startswith("post_"):
+        bump_cache_version(Title._meta.model_name)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def refresh_ranking_on_genre_change(sender, instance, action, reverse,
+                                    pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    titles = (pk_set or ()) if reverse else [instance]
+    for title in titles:
+        refresh_title_ranking(title)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def bump_title_reviews_cache_version(sender, instance, **kwargs):
+    bump_cache_version(f"title-reviews:{instance.title_id}")
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_review_comments_cache_version(sender, instance, **kwargs):
+    bump_cache_version(f"review-comments:{instance.review_id}")
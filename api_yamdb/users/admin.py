@@ -2,6 +2,8 @@ from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth import get_user_model
 
+from users.models import OutgoingEmail
+
 User = get_user_model()
 
 
@@ -23,3 +25,14 @@ class UserAdmin(admin.ModelAdmin):
     list_per_page = settings.LIST_PER_PAGE
     search_fields = ("username", "role")
     empty_value_display = "-пусто-"
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    """Настройка очереди писем."""
+
+    list_display = ("pk", "to", "subject", "status", "attempts", "created")
+    list_filter = ("status",)
+    list_per_page = settings.LIST_PER_PAGE
+    search_fields = ("to",)
+    empty_value_display = "-пусто-"
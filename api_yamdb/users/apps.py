@@ -6,3 +6,6 @@ class UsersConfig(AppConfig):
     name = "users"
     verbose_name = "Пользователь"
     verbose_name_plural = "Пользователи"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,62 @@
+"""Кэш пользователей в памяти процесса.
+
+Аутентификация по токену без claims и места, где нужен полный объект
+модели, берут пользователя отсюда, а не из базы на каждый запрос.
+Записи сбрасываются сигналами при сохранении и удалении пользователя,
+а изменения из других процессов видны не позже чем через
+``USER_CACHE_TIMEOUT`` секунд.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+
+class UserCache:
+    """LRU-кэш пользователей по ``pk`` на ``maxsize`` записей,
+    каждая живёт ``timeout`` секунд.
+    """
+
+    def __init__(self, maxsize, timeout):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.users = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id):
+        """Копия пользователя из кэша или базы, ``None`` если его нет."""
+        now = time.monotonic()
+        with self.lock:
+            user, expires = self.users.get(user_id, (None, now))
+            if expires > now:
+                self.users.move_to_end(user_id)
+            else:
+                user = None
+        if user is None:
+            User = get_user_model()
+            user = User.objects.filter(pk=user_id).first()
+            if user is None:
+                return None
+            with self.lock:
+                self.users[user_id] = (user, now + self.timeout)
+                self.users.move_to_end(user_id)
+                while len(self.users) > self.maxsize:
+                    self.users.popitem(last=False)
+        # Запросы не должны видеть изменения объекта друг друга.
+        return copy.copy(user)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.users.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.users.clear()
+
+
+user_cache = UserCache(
+    settings.USER_CACHE_SIZE, settings.USER_CACHE_TIMEOUT
+)
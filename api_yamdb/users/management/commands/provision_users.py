@@ -0,0 +1,183 @@
+import os
+from collections import Counter
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import get_connection, send_mass_mail
+from django.core.management import BaseCommand, CommandError
+from django.db import connection as db_connection
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from api.v1.serializers import UserCreateSerializer
+from api.v1.utils import confirmation_message
+from reviews.management.commands.import_reviews import read_rows
+
+User = get_user_model()
+
+# Число значений в одном запросе fold_case.
+FOLD_CHUNK_SIZE = 500
+
+
+def fold_case(values):
+    """Значения, приведённые к нижнему регистру функцией LOWER() базы.
+
+    Ключи пачки сравниваются с ``Lower("username")`` и ``Lower("email")``
+    и должны приводиться так же: ``str.lower`` меняет регистр кириллицы,
+    а LOWER() в SQLite - только ASCII.
+    """
+    folded = []
+    with db_connection.cursor() as cursor:
+        for start in range(0, len(values), FOLD_CHUNK_SIZE):
+            chunk = values[start:start + FOLD_CHUNK_SIZE]
+            cursor.execute(
+                "SELECT " + ", ".join(["LOWER(%s)"] * len(chunk)), chunk
+            )
+            folded.extend(cursor.fetchone())
+    return folded
+
+
+class Command(BaseCommand):
+    """Массовое создание пользователей с отправкой кодов подтверждения."""
+
+    help = (
+        "Создаёт пользователей из CSV или JSON Lines (поля username, email) "
+        "и отправляет им коды подтверждения пачками."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Путь к файлу с пользователями.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Число записей в пачке и писем в одной отправке.",
+        )
+
+    def handle(self, *args, **options):
+        if not os.path.isfile(options["path"]):
+            raise CommandError(f"Файл {options['path']} не найден.")
+        if options["batch_size"] < 1:
+            raise CommandError("Размер пачки должен быть положительным.")
+        report = Counter()
+        seen = set()
+        rows = enumerate(read_rows(options["path"]), 1)
+        connection = get_connection()
+        connection.open()
+        try:
+            for batch in iter(
+                lambda: list(islice(rows, options["batch_size"])), []
+            ):
+                users = self.clean_batch(batch, seen, report)
+                created = self.create_users(users, report)
+                self.send_codes(created, connection, report)
+        finally:
+            connection.close()
+        self.stdout.write(
+            f"Создано пользователей: {report['created']}, "
+            f"уже существовало: {report['existing']}, "
+            f"отклонено: {report['rejected']}, "
+            f"отправлено писем: {report['sent']}."
+        )
+
+    def reject(self, report, number, message):
+        report["rejected"] += 1
+        self.stderr.write(f"Запись {number}: {message}")
+
+    def clean_batch(self, batch, seen, report):
+        """Записи, прошедшие проверки UserCreateSerializer, по username.
+
+        ``seen`` - имена и адреса из предыдущих записей файла: повтор
+        отклоняется, а не перезаписывает первую запись.
+        """
+        valid = []
+        for number, row in batch:
+            serializer = UserCreateSerializer(
+                data=row if isinstance(row, dict) else {}
+            )
+            if not serializer.is_valid():
+                self.reject(
+                    report,
+                    number,
+                    "; ".join(
+                        f"{field}: {' '.join(errors)}"
+                        for field, errors in serializer.errors.items()
+                    ),
+                )
+                continue
+            data = serializer.validated_data
+            valid.append((number, data["username"], data["email"]))
+        folded = iter(
+            fold_case([value for _, *pair in valid for value in pair])
+        )
+        users = {}
+        for number, username, email in valid:
+            keys = (next(folded), next(folded))
+            if seen.intersection(keys):
+                self.reject(report, number, "Повтор в файле.")
+                continue
+            seen.update(keys)
+            users[keys[0]] = (number, username, email, keys[1])
+        return users
+
+    def create_users(self, users, report):
+        """Создаёт новых пользователей пачки, возвращает созданных.
+
+        Пара username-email, уже существующая в базе, пропускается, а
+        занятые другим пользователем имя или адрес отклоняются. Как и
+        уникальные индексы, сравнение не учитывает регистр.
+        """
+        emails = {
+            email_key: key for key, (_, _, _, email_key) in users.items()
+        }
+        casefold = User.objects.annotate(
+            username_ci=Lower("username"), email_ci=Lower("email")
+        )
+        taken = casefold.filter(
+            Q(username_ci__in=users) | Q(email_ci__in=emails)
+        ).values_list("username_ci", "email_ci")
+        for username, email in taken:
+            if emails.get(email) == username:
+                report["existing"] += 1
+                del users[username]
+                continue
+            for conflict in (username, emails.get(email)):
+                if conflict in users:
+                    number, *_ = users.pop(conflict)
+                    self.reject(
+                        report, number, "Имя или адрес уже заняты."
+                    )
+        User.objects.bulk_create(
+            (
+                User(username=username, email=email)
+                for _, username, email, _ in users.values()
+            ),
+            ignore_conflicts=True,
+        )
+        # bulk_create не возвращает pk на всех базах, а строки, вставленные
+        # параллельно с нами, пропускаются: созданные читаются заново.
+        created = [
+            user
+            for user in casefold.filter(username_ci__in=users)
+            if user.email == users[user.username_ci][2]
+        ]
+        report["created"] += len(created)
+        return created
+
+    def send_codes(self, users, connection, report):
+        if not users:
+            return
+        messages = [
+            confirmation_message(
+                user.email, default_token_generator.make_token(user)
+            )
+            for user in users
+        ]
+        try:
+            report["sent"] += send_mass_mail(messages, connection=connection)
+        except Exception as error:
+            self.stderr.write(
+                f"Не отправлено писем: {len(messages)} ({error}). "
+                "Код можно запросить повторно через auth/signup."
+            )
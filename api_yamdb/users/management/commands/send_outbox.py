@@ -0,0 +1,69 @@
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management import BaseCommand
+
+from users.outbox import drain_outbox, outbox_stats
+
+
+class Command(BaseCommand):
+    """Отправка писем из очереди."""
+
+    help = (
+        "Отправляет письма из очереди пачками через одно соединение "
+        "с почтовым сервером и повторяет неудачные попытки."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Работать постоянно, ожидая новые письма.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.OUTBOX_BATCH_SIZE,
+            help="Число писем в пачке.",
+        )
+        parser.add_argument(
+            "--stats",
+            action="store_true",
+            help="Только вывести метрики очереди.",
+        )
+
+    def handle(self, *args, **options):
+        if options["stats"]:
+            return self.write_stats()
+        connection = get_connection()
+        connection.open()
+        try:
+            while True:
+                started = time.perf_counter()
+                sent, failed = drain_outbox(connection, options["batch_size"])
+                if sent or failed:
+                    elapsed = (time.perf_counter() - started) * 1000
+                    self.stdout.write(
+                        f"Отправлено писем: {sent}, ошибок: {failed}, "
+                        f"{elapsed / (sent + failed):.1f} мс на письмо."
+                    )
+                    continue
+                if not options["loop"]:
+                    break
+                time.sleep(settings.OUTBOX_IDLE_INTERVAL)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
+        self.write_stats()
+
+    def write_stats(self):
+        stats = outbox_stats()
+        self.stdout.write(
+            f"В очереди: {stats['pending']}, "
+            f"не отправлено: {stats['failed']}, "
+            f"ожидает дольше всех: {stats['oldest_pending_age']:.1f} с, "
+            f"задержка доставки: медиана {stats['latency_median']:.1f} с, "
+            f"максимум {stats['latency_max']:.1f} с."
+        )
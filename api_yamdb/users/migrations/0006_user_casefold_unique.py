@@ -0,0 +1,47 @@
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+# Django 3.2 не умеет уникальные ограничения по выражениям, поэтому
+# индексы создаются SQL-запросом; LOWER есть и в SQLite, и в PostgreSQL.
+CREATE_INDEXES = [
+    "CREATE UNIQUE INDEX users_user_username_ci_uniq "
+    "ON users_user (LOWER(username));",
+    "CREATE UNIQUE INDEX users_user_email_ci_uniq "
+    "ON users_user (LOWER(email));",
+]
+DROP_INDEXES = [
+    "DROP INDEX users_user_username_ci_uniq;",
+    "DROP INDEX users_user_email_ci_uniq;",
+]
+
+
+def check_case_duplicates(apps, schema_editor):
+    """Останавливает миграцию со списком дублей вместо IntegrityError."""
+    User = apps.get_model("users", "User")
+    duplicates = []
+    for field in ("username", "email"):
+        duplicates += (
+            User.objects.annotate(value=Lower(field))
+            .values("value")
+            .annotate(total=Count("pk"))
+            .filter(total__gt=1)
+            .values_list("value", flat=True)
+        )
+    if duplicates:
+        raise RuntimeError(
+            "Есть пользователи, различающиеся только регистром: "
+            f"{', '.join(duplicates)}. Объедините их перед миграцией."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0005_outgoingemail"),
+    ]
+
+    operations = [
+        migrations.RunPython(check_case_duplicates, migrations.RunPython.noop),
+        migrations.RunSQL(CREATE_INDEXES, DROP_INDEXES),
+    ]
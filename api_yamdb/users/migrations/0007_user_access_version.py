@@ -0,0 +1,36 @@
+from django.db import migrations, models
+
+# SQLite добавляет поле пересозданием таблицы и теряет индексы по LOWER(),
+# созданные SQL-запросом в 0006, поэтому они создаются заново; в
+# PostgreSQL они сохраняются, и IF NOT EXISTS их пропускает.
+CREATE_INDEXES = [
+    "CREATE UNIQUE INDEX IF NOT EXISTS users_user_username_ci_uniq "
+    "ON users_user (LOWER(username));",
+    "CREATE UNIQUE INDEX IF NOT EXISTS users_user_email_ci_uniq "
+    "ON users_user (LOWER(email));",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0006_user_casefold_unique"),
+    ]
+
+    operations = [
+        # При откате поле удаляется так же пересозданием таблицы.
+        migrations.RunSQL(migrations.RunSQL.noop, CREATE_INDEXES),
+        migrations.AddField(
+            model_name="user",
+            name="access_version",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text=(
+                    "Растёт при смене роли и флагов, отзывая claims токенов."
+                ),
+                verbose_name="Версия прав доступа",
+            ),
+        ),
+        migrations.RunSQL(CREATE_INDEXES, migrations.RunSQL.noop),
+    ]
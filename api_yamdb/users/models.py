@@ -1,6 +1,9 @@
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models import BooleanField, ExpressionWrapper, Q, Value
+from django.db.models.functions import Lower
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -29,6 +32,12 @@ class User(AbstractUser):
         choices=ROLES,
         verbose_name="Тип учетной записи",
     )
+    access_version = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Версия прав доступа",
+        help_text="Растёт при смене роли и флагов, отзывая claims токенов.",
+    )
 
     class Meta:
         verbose_name = "Пользователь"
@@ -43,6 +52,32 @@ class User(AbstractUser):
     def __str__(self):
         return self.username
 
+    @classmethod
+    def find_casefold(cls, username, email):
+        """Пользователи с тем же username или email без учёта регистра.
+
+        Сравнение идёт по ``LOWER`` в базе, как в уникальных индексах
+        users_user_username_ci_uniq и users_user_email_ci_uniq, и
+        использует их. Флаги ``same_username`` и ``same_email`` показывают,
+        что совпало.
+        """
+        username_ci = Lower(Value(username))
+        email_ci = Lower(Value(email))
+        return (
+            cls.objects.annotate(
+                username_ci=Lower("username"), email_ci=Lower("email")
+            )
+            .filter(Q(username_ci=username_ci) | Q(email_ci=email_ci))
+            .annotate(
+                same_username=ExpressionWrapper(
+                    Q(username_ci=username_ci), output_field=BooleanField()
+                ),
+                same_email=ExpressionWrapper(
+                    Q(email_ci=email_ci), output_field=BooleanField()
+                ),
+            )
+        )
+
     @property
     def is_moderator(self):
         return self.role == settings.MODERATOR
@@ -50,3 +85,57 @@ class User(AbstractUser):
     @property
     def is_admin(self):
         return self.role == settings.ADMIN or self.is_superuser
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди отправки.
+
+    Запросы только добавляют письма, отправляет их команда send_outbox.
+    """
+
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUSES = (
+        (PENDING, "В очереди"),
+        (SENT, "Отправлено"),
+        (FAILED, "Не отправлено"),
+    )
+    subject = models.CharField(max_length=255, verbose_name="Тема")
+    body = models.TextField(verbose_name="Текст")
+    from_email = models.EmailField(verbose_name="Отправитель")
+    to = models.EmailField(verbose_name="Получатель")
+    status = models.CharField(
+        default=PENDING,
+        max_length=10,
+        choices=STATUSES,
+        verbose_name="Статус",
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name="Попыток отправки"
+    )
+    last_error = models.TextField(blank=True, verbose_name="Последняя ошибка")
+    created = models.DateTimeField(
+        auto_now_add=True, verbose_name="Добавлено в очередь"
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now, verbose_name="Следующая попытка"
+    )
+    sent_at = models.DateTimeField(
+        null=True, blank=True, verbose_name="Отправлено"
+    )
+
+    class Meta:
+        verbose_name = "Письмо в очереди"
+        verbose_name_plural = "Очередь писем"
+        indexes = [
+            # Выборка очередной пачки и подсчёт глубины очереди.
+            models.Index(
+                fields=("status", "next_attempt_at"),
+                name="outbox_status_next_idx",
+            ),
+        ]
+        ordering = ("-created",)
+
+    def __str__(self):
+        return f"{self.to}: {self.subject}"
@@ -0,0 +1,122 @@
+"""Очередь исходящих писем в базе.
+
+``enqueue_email`` вызывается в запросе и пишет одну строку, отправкой
+занимается ``drain_outbox`` из команды send_outbox. Один процесс
+отправки на базу: пачка выбирается без блокировки строк.
+"""
+import statistics
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+
+def enqueue_email(subject, body, from_email, to):
+    return OutgoingEmail.objects.create(
+        subject=subject, body=body, from_email=from_email, to=to
+    )
+
+
+def get_retry_delay(attempts):
+    """Экспоненциальная задержка перед следующей попыткой."""
+    return timedelta(
+        seconds=settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def close_connection(connection):
+    """Закрывает соединение после ошибки отправки.
+
+    SMTP-бэкенд не замечает соединения, оборванного сервером: ``open()``
+    ничего не делает, пока ``close()`` не сбросит старое.
+    """
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+def drain_outbox(connection=None, batch_size=None):
+    """Отправляет одну пачку готовых к отправке писем.
+
+    Все письма пачки уходят через одно соединение ``connection``, его
+    стоит передавать между пачками. После ошибки отправки соединение
+    закрывается и открывается заново перед следующим письмом. Возвращает
+    число отправленных писем и число неудачных попыток.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    emails = list(
+        OutgoingEmail.objects.filter(
+            status=OutgoingEmail.PENDING,
+            next_attempt_at__lte=timezone.now(),
+        ).order_by("next_attempt_at", "id")[:batch_size]
+    )
+    if not emails:
+        return 0, 0
+    own_connection = connection is None
+    connection = connection or get_connection()
+    sent = failed = 0
+    for email in emails:
+        message = EmailMessage(
+            subject=email.subject,
+            body=email.body,
+            from_email=email.from_email,
+            to=[email.to],
+            connection=connection,
+        )
+        email.attempts += 1
+        try:
+            connection.open()
+            message.send()
+        except Exception as error:
+            close_connection(connection)
+            failed += 1
+            email.last_error = f"{type(error).__name__}: {error}"
+            if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                email.status = OutgoingEmail.FAILED
+            else:
+                email.next_attempt_at = timezone.now() + get_retry_delay(
+                    email.attempts
+                )
+            continue
+        sent += 1
+        email.status = OutgoingEmail.SENT
+        email.sent_at = timezone.now()
+    if own_connection:
+        close_connection(connection)
+    OutgoingEmail.objects.bulk_update(
+        emails,
+        ["status", "attempts", "last_error", "next_attempt_at", "sent_at"],
+    )
+    return sent, failed
+
+
+def outbox_stats(sample=1000):
+    """Глубина очереди и задержка доставки последних писем в секундах."""
+    pending = OutgoingEmail.objects.filter(status=OutgoingEmail.PENDING)
+    oldest = pending.order_by("created").values_list("created", flat=True)
+    latencies = [
+        (sent_at - created).total_seconds()
+        for created, sent_at in OutgoingEmail.objects.filter(
+            status=OutgoingEmail.SENT
+        )
+        .order_by("-sent_at")
+        .values_list("created", "sent_at")[:sample]
+    ]
+    oldest = oldest.first()
+    return {
+        "pending": pending.count(),
+        "failed": OutgoingEmail.objects.filter(
+            status=OutgoingEmail.FAILED
+        ).count(),
+        "oldest_pending_age": (
+            (timezone.now() - oldest).total_seconds() if oldest else 0.0
+        ),
+        "latency_median": (
+            statistics.median(latencies) if latencies else 0.0
+        ),
+        "latency_max": max(latencies, default=0.0),
+    }
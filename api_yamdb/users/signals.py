@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from reviews.cache import versions_are_shared
+
+from .cache import user_cache
+
+User = get_user_model()
+
+ACCESS_VERSION_KEY = "user-access-version:{}"
+
+
+def get_access(user):
+    return (user.role, user.is_staff, user.is_superuser, user.is_active)
+
+
+def get_access_version(user_id):
+    """Текущая версия прав пользователя, ``None`` если его нет.
+
+    Версия читается из общего кэша, а если её там нет (вытеснена) или
+    кэш свой у каждого процесса, - из базы.
+    """
+    key = ACCESS_VERSION_KEY.format(user_id)
+    shared = versions_are_shared()
+    version = cache.get(key) if shared else None
+    if version is None:
+        version = (
+            User.objects.filter(pk=user_id)
+            .values_list("access_version", flat=True)
+            .first()
+        )
+        if version is not None and shared:
+            cache.add(key, version, None)
+    return version
+
+
+def bump_access_version(user):
+    """Увеличивает версию прав: claims старых токенов перестают с ней
+    совпадать во всех процессах.
+    """
+    users = User.objects.filter(pk=user.pk)
+    users.update(access_version=F("access_version") + 1)
+    user.access_version = users.values_list(
+        "access_version", flat=True
+    ).get()
+    key = ACCESS_VERSION_KEY.format(user.pk)
+    version = user.access_version
+    transaction.on_commit(lambda: cache.set(key, version, None))
+
+
+@receiver(post_init, sender=User)
+def remember_user_access(sender, instance, **kwargs):
+    """Запоминает загруженные из базы роль и флаги доступа."""
+    instance._loaded_access = get_access(instance)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_on_save(sender, instance, created, **kwargs):
+    if not created and instance._loaded_access != get_access(instance):
+        bump_access_version(instance)
+    user_cache.invalidate(instance.pk)
+    instance._loaded_access = get_access(instance)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_user_on_delete(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+    key = ACCESS_VERSION_KEY.format(instance.pk)
+    transaction.on_commit(lambda: cache.delete(key))
@@ -0,0 +1,74 @@
+"""Накладные расходы ограничения частоты на пропущенные запросы.
+
+Сравнивает ``POST /api/v1/auth/token/`` с корзинами и без них, а также
+стоимость одной проверки корзины и её поведение при конкурентных потоках.
+"""
+import argparse
+import threading
+import time
+
+from benchmarks.utils import measure, report, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=10000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from rest_framework.test import APIClient
+
+    from api.v1 import views
+    from api.v1.throttling import CacheBuckets, MemoryBuckets
+
+    # Ставки, при которых пропускаются все запросы бенчмарка.
+    settings.AUTH_RATE_LIMITS = {
+        scope: "1000000000/s"
+        for scope in ("auth-ip", "auth-email", "auth-username")
+    }
+    client = APIClient()
+    data = {"username": "nobody", "confirmation_code": "wrong"}
+
+    def token_request():
+        client.post("/api/v1/auth/token/", data=data)
+
+    throttles = views.get_token.cls.throttle_classes
+    report("POST /auth/token/ with throttles", measure(token_request))
+    views.get_token.cls.throttle_classes = ()
+    report("POST /auth/token/ without throttles", measure(token_request))
+    views.get_token.cls.throttle_classes = throttles
+
+    for name, buckets in (
+        ("memory", MemoryBuckets()),
+        ("default cache", CacheBuckets("default")),
+    ):
+        def consume(buckets=buckets):
+            for idx in range(args.calls):
+                buckets.consume(f"ip:{idx % 1000}", 10 ** 9, 10 ** 9)
+
+        per_call = measure(consume, repeat=5) / args.calls * 1000
+        print(f"{name + ' bucket check':<50} {per_call:10.2f} us")
+
+    buckets = MemoryBuckets()
+
+    def worker(offset):
+        for idx in range(args.calls):
+            buckets.consume(f"ip:{offset}:{idx % 1000}", 10 ** 9, 10 ** 9)
+
+    threads = [
+        threading.Thread(target=worker, args=(offset,))
+        for offset in range(args.threads)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = (time.perf_counter() - start) * 1000
+    report(f"{args.threads} threads x {args.calls} memory checks", elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Страницы вложенных списков отзывов и комментариев с индексами и без.
+
+Сравнивает выборку первой страницы ``/titles/{id}/reviews/`` и
+``/titles/{id}/reviews/{id}/comments/`` в обоих режимах пагинации до и
+после составных индексов (родитель, -pub_date, -id): без них SQLite
+берёт индекс внешнего ключа и сортирует все строки родителя.
+"""
+import argparse
+
+from benchmarks.utils import (create_comments, create_reviews, create_titles,
+                              create_users, measure, report, setup_django)
+
+INDEXES = (
+    ("Review", "review_title_pub_date_idx"),
+    ("Comment", "comment_review_pub_date_idx"),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reviews", type=int, default=20_000)
+    parser.add_argument("--comments", type=int, default=20_000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from rest_framework.test import APIClient
+    from reviews.models import Comment, Review
+
+    user_ids = create_users(max(args.reviews, args.comments))
+    title_id = create_titles(1)[0]
+    create_reviews([title_id], user_ids, args.reviews)
+    review_id = Review.objects.order_by("pk").values_list("pk", flat=True)[0]
+    create_comments([review_id], user_ids, args.comments)
+    print(f"reviews={args.reviews} comments={args.comments} on one parent")
+
+    indexes = [
+        (model, index)
+        for model in (Review, Comment)
+        for index in model._meta.indexes
+        if (model.__name__, index.name) in INDEXES
+    ]
+    client = APIClient()
+    reviews_url = f"/api/v1/titles/{title_id}/reviews/"
+    comments_url = f"{reviews_url}{review_id}/comments/"
+    pages = {
+        "review page queryset": lambda: list(
+            Review.objects.filter(title_id=title_id).order_by(
+                "-pub_date", "-id"
+            )[:10]
+        ),
+        "comment page queryset": lambda: list(
+            Comment.objects.filter(review_id=review_id).order_by(
+                "-pub_date", "-id"
+            )[:10]
+        ),
+        "GET reviews/?cursor=": lambda: client.get(f"{reviews_url}?cursor="),
+        "GET comments/?cursor=": lambda: client.get(
+            f"{comments_url}?cursor="
+        ),
+    }
+
+    with connection.schema_editor() as editor:
+        for model, index in indexes:
+            editor.remove_index(model, index)
+    for name, page in pages.items():
+        report(f"{name} (before)", measure(page))
+    with connection.schema_editor() as editor:
+        for model, index in indexes:
+            editor.add_index(model, index)
+    for name, page in pages.items():
+        report(f"{name} (after)", measure(page))
+
+
+if __name__ == "__main__":
+    main()
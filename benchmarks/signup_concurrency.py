@@ -0,0 +1,96 @@
+"""Параллельные повторные регистрации в разном регистре.
+
+Сравнивает прежний путь (``get_or_create`` по точному совпадению) с
+``get_signup_user``: время, число созданных пользователей-дублей и
+запросов, завершившихся ошибкой вставки.
+"""
+import argparse
+import threading
+import time
+from collections import Counter
+
+from benchmarks.utils import report, setup_django
+
+
+def run(signup, names, threads, rounds):
+    from django.db import IntegrityError, OperationalError, connection
+    from rest_framework.exceptions import ValidationError
+
+    outcomes = Counter()
+    lock = threading.Lock()
+
+    def worker(offset):
+        local = Counter()
+        for step in range(rounds):
+            name = names[(offset + step) % len(names)]
+            variant = name.upper() if offset % 2 else name
+            try:
+                signup(variant, f"{variant}@yamdb.fake")
+                local["ok"] += 1
+            except ValidationError:
+                local["conflict"] += 1
+            except (IntegrityError, OperationalError):
+                local["insert error"] += 1
+        connection.close()
+        with lock:
+            outcomes.update(local)
+
+    workers = [
+        threading.Thread(target=worker, args=(offset,))
+        for offset in range(threads)
+    ]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return (time.perf_counter() - start) * 1000, outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--names", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    from importlib import import_module
+
+    from django.conf import settings
+    from django.db import connection
+
+    from api.v1.views import get_signup_user
+    from users.models import User
+
+    migration = import_module("users.migrations.0006_user_casefold_unique")
+    settings.DATABASES["default"].setdefault("OPTIONS", {})["timeout"] = 30
+
+    def legacy_signup(username, email):
+        return User.objects.get_or_create(username=username, email=email)[0]
+
+    def execute(statements):
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    total = args.threads * args.rounds
+    names = [f"user{idx}" for idx in range(args.names)]
+    for name, signup, statements in (
+        # Прежний путь работал без индексов по LOWER() и плодил дубли.
+        ("get_or_create", legacy_signup, migration.DROP_INDEXES),
+        ("get_signup_user", get_signup_user, migration.CREATE_INDEXES),
+    ):
+        User.objects.all().delete()
+        execute(statements)
+        elapsed, outcomes = run(signup, names, args.threads, args.rounds)
+        report(f"{name}: {total} signups", elapsed)
+        print(
+            f"{'':<4}{total / elapsed * 1000:.0f} ops/s, "
+            f"users: {User.objects.count()} of {len(names)}, "
+            f"{dict(outcomes)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Создание произведений: ``POST /titles/`` по одному против ``/titles/bulk/``.
+"""
+import argparse
+import time
+
+from benchmarks.utils import report, setup_django
+
+
+def make_items(count, genres, offset):
+    return [
+        {
+            "name": f"Title {offset + idx}",
+            "year": 2000,
+            "category": "films",
+            "genre": genres[idx % 8:idx % 8 + 3],
+        }
+        for idx in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--titles", type=int, default=10000)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from rest_framework.test import APIClient
+    from reviews.models import Category, Genre
+
+    admin = get_user_model().objects.create(
+        username="admin", email="admin@yamdb.fake", role="admin"
+    )
+    client = APIClient()
+    client.force_authenticate(admin)
+    Category.objects.create(name="Фильмы", slug="films")
+    genres = [f"genre-{idx}" for idx in range(10)]
+    Genre.objects.bulk_create(
+        Genre(name=slug, slug=slug) for slug in genres
+    )
+
+    start = time.perf_counter()
+    for item in make_items(args.titles, genres, 0):
+        client.post("/api/v1/titles/", data=item, format="json")
+    report(
+        f"{args.titles} x POST /api/v1/titles/",
+        (time.perf_counter() - start) * 1000,
+    )
+
+    items = make_items(args.titles, genres, args.titles)
+    start = time.perf_counter()
+    for offset in range(0, len(items), args.batch):
+        client.post(
+            "/api/v1/titles/bulk/",
+            data=items[offset:offset + args.batch],
+            format="json",
+        )
+    report(
+        f"{args.titles} via /titles/bulk/ by {args.batch}",
+        (time.perf_counter() - start) * 1000,
+    )
+
+
+if __name__ == "__main__":
+    main()
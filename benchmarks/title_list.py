@@ -0,0 +1,46 @@
+"""Время ответа ``GET /api/v1/titles/`` с рейтингом на большом числе отзывов.
+
+Сравнивает прежнюю агрегацию ``Avg("reviews__score")`` при каждом чтении
+с чтением денормализованных счётчиков ``Title.score_sum``/``reviews_count``.
+"""
+import argparse
+
+from benchmarks.utils import (create_reviews, create_titles, create_users,
+                              measure, report, setup_django)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reviews", type=int, default=1_000_000)
+    parser.add_argument("--titles", type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db.models import Avg
+    from rest_framework.test import APIClient
+    from reviews.models import Title
+
+    per_title = max(args.reviews // args.titles, 1)
+    title_ids = create_titles(args.titles)
+    user_ids = create_users(per_title)
+    create_reviews(title_ids, user_ids, per_title)
+    print(f"titles={args.titles} reviews={per_title * args.titles}")
+
+    def annotated_page():
+        list(Title.objects.annotate(avg=Avg("reviews__score"))[:5])
+
+    def counters_page():
+        list(Title.objects.all()[:5])
+
+    client = APIClient()
+
+    def api_list():
+        client.get("/api/v1/titles/")
+
+    report("page with Avg('reviews__score')", measure(annotated_page))
+    report("page with stored counters", measure(counters_page))
+    report("GET /api/v1/titles/", measure(api_list))
+
+
+if __name__ == "__main__":
+    main()
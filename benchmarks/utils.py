@@ -0,0 +1,119 @@
+"""Общие помощники для бенчмарков.
+
+Бенчмарки запускаются из корня репозитория, например::
+
+    python -m benchmarks.title_list --reviews 1000000
+
+Каждый запуск работает с отдельной временной базой SQLite и не трогает
+рабочую ``db.sqlite3``.
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "api_yamdb"))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "api_yamdb.settings")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+
+def setup_django():
+    """Настраивает Django на временную базу и применяет миграции."""
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    handle, path = tempfile.mkstemp(suffix=".sqlite3")
+    os.close(handle)
+    settings.DATABASES["default"]["NAME"] = path
+    settings.DEBUG = False
+    django.setup()
+    call_command("migrate", verbosity=0)
+    return path
+
+
+def measure(func, repeat=20):
+    """Возвращает медиану времени выполнения ``func`` в миллисекундах."""
+    func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def report(name, value):
+    print(f"{name:<50} {value:10.2f} ms")
+
+
+def create_users(count, prefix="user"):
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+    User.objects.bulk_create(
+        (
+            User(username=f"{prefix}{i}", email=f"{prefix}{i}@yamdb.fake")
+            for i in range(count)
+        ),
+        batch_size=1000,
+    )
+    return list(User.objects.order_by("pk").values_list("pk", flat=True))
+
+
+def create_titles(count):
+    from reviews.models import Category, Genre, Title
+
+    category = Category.objects.create(name="Фильмы", slug="films")
+    genre = Genre.objects.create(name="Драма", slug="drama")
+    Title.objects.bulk_create(
+        (
+            Title(name=f"Title {i}", year=2000, category=category)
+            for i in range(count)
+        ),
+        batch_size=1000,
+    )
+    title_ids = list(Title.objects.order_by("pk").values_list("pk", flat=True))
+    Title.genre.through.objects.bulk_create(
+        (
+            Title.genre.through(title_id=title_id, genre_id=genre.pk)
+            for title_id in title_ids
+        ),
+        batch_size=1000,
+    )
+    return title_ids
+
+
+def create_reviews(title_ids, user_ids, per_title):
+    """Создаёт ``per_title`` отзывов на каждое произведение в обход API."""
+    from django.core.management import call_command
+    from reviews.models import Review
+
+    def generate():
+        for title_id in title_ids:
+            for author_id in user_ids[:per_title]:
+                yield Review(
+                    title_id=title_id,
+                    author_id=author_id,
+                    text="benchmark",
+                    score=(title_id + author_id) % 10 + 1,
+                )
+
+    Review.objects.bulk_create(generate(), batch_size=5000)
+    call_command("rebuild_ratings", verbosity=0, stdout=open(os.devnull, "w"))
+
+
+def create_comments(review_ids, user_ids, per_review):
+    """Создаёт ``per_review`` комментариев к каждому отзыву в обход API."""
+    from reviews.models import Comment
+
+    Comment.objects.bulk_create(
+        (
+            Comment(review_id=review_id, author_id=author_id, text="benchmark")
+            for review_id in review_ids
+            for author_id in user_ids[:per_review]
+        ),
+        batch_size=5000,
+    )
@@ -0,0 +1,16 @@
+import pytest
+from django.core.cache import cache
+
+from api.v1.throttling import memory_buckets
+from users.cache import user_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    user_cache.clear()
+    memory_buckets.clear()
+    yield
+    cache.clear()
+    user_cache.clear()
+    memory_buckets.clear()
@@ -0,0 +1,116 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from reviews.models import Title, TitleRatingStats
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def check_rating(self, client, title_id, expected):
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json().get('rating') == expected, (
+            'Проверьте, что поле `rating` произведения пересчитывается при '
+            'изменении отзывов.'
+        )
+        call_command('rebuild_ratings', check=True)
+
+    def test_01_rating_follows_review_changes(self, client, admin_client,
+                                              admin, user, user_client,
+                                              moderator, moderator_client):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        self.check_rating(client, title_id, 5)
+
+        response = user_client.patch(
+            f'{url}{reviews[1]["id"]}/', data={'score': 8}
+        )
+        assert response.status_code == HTTPStatus.OK
+        self.check_rating(client, title_id, 6)
+
+        response = admin_client.delete(f'{url}{reviews[0]["id"]}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        self.check_rating(client, title_id, 6)
+
+        moderator.delete()
+        self.check_rating(client, title_id, 8)
+
+        user.delete()
+        self.check_rating(client, title_id, None)
+
+    def test_02_rebuild_ratings(self, client, admin_client, admin, user,
+                                user_client):
+        author_map = {admin: admin_client, user: user_client}
+        _, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        Title.objects.filter(pk=title_id).update(
+            score_sum=0, reviews_count=0
+        )
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', check=True)
+        # Ответ с неверным рейтингом попадает в кэш.
+        etag = client.get(f'/api/v1/titles/{title_id}/')['ETag']
+        call_command('rebuild_ratings')
+        self.check_rating(client, title_id, 5)
+        response = client.get(
+            f'/api/v1/titles/{title_id}/', HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что rebuild_ratings сбрасывает кэш и ETag '
+            'произведений.'
+        )
+
+        TitleRatingStats.objects.filter(title_id=title_id).update(score_5=7)
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', check=True)
+        call_command('rebuild_ratings')
+        call_command('rebuild_ratings', check=True)
+
+    def test_03_rating_stats(self, client, admin_client, admin, user,
+                             user_client, moderator, moderator_client,
+                             django_assert_num_queries):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/rating-stats/'
+        user_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[1]["id"]}/',
+            data={'score': 9}
+        )
+        moderator.delete()
+
+        with django_assert_num_queries(1):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        expected_scores = {str(score): 0 for score in range(1, 11)}
+        expected_scores.update({'5': 1, '9': 1})
+        assert data == {
+            'title': title_id,
+            'scores': expected_scores,
+            'total': 2,
+            'mean': 7.0,
+        }
+        call_command('rebuild_ratings', check=True)
+
+        response = client.get(f'/api/v1/titles/{titles[1]["id"]}/rating-stats/')
+        assert response.json()['total'] == 0
+        assert response.json()['mean'] is None
+        response = client.get('/api/v1/titles/0/rating-stats/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        response = client.get('/api/v1/titles/abc/rating-stats/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,153 @@
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Review, Title
+
+
+def create_catalog(size):
+    genres = [
+        Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+        for idx in range(3)
+    ]
+    titles = []
+    for idx in range(size):
+        category = Category.objects.create(
+            name=f'Категория {idx}', slug=f'category-{idx}'
+        )
+        title = Title.objects.create(
+            name=f'Произведение {idx}', year=2000, category=category
+        )
+        title.genre.set(genres[:2])
+        titles.append(title)
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryCount:
+
+    @pytest.mark.parametrize('size', (1, 10))
+    def test_01_title_list(self, client, django_assert_num_queries, size):
+        create_catalog(size)
+        # COUNT, страница произведений с категориями и жанры всей страницы.
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/titles/?limit=100')
+        results = response.json()['results']
+        assert len(results) == size
+        assert all(len(title['genre']) == 2 for title in results)
+        assert all(title['category'] for title in results)
+
+    def test_02_title_detail(self, client, django_assert_num_queries):
+        title = create_catalog(1)[0]
+        with django_assert_num_queries(2):
+            response = client.get(f'/api/v1/titles/{title.id}/')
+        assert len(response.json()['genre']) == 2
+
+    def test_03_review_create(self, user, user_client):
+        title = create_catalog(1)[0]
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        with CaptureQueriesContext(connection) as queries:
+            response = user_client.post(url, data={'text': 'Отзыв', 'score': 7})
+        assert response.status_code == HTTPStatus.CREATED
+        title_reads = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_title"' in query['sql']
+        ]
+        assert len(title_reads) == 1, (
+            'Проверьте, что при создании отзыва произведение читается '
+            'из базы один раз.'
+        )
+        assert not any(
+            'FROM "reviews_review"' in query['sql']
+            for query in queries.captured_queries
+        )
+
+        response = user_client.post(url, data={'text': 'Ещё', 'score': 1})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {
+            'non_field_errors': ['Вы не можете повторно оставить рецензию.']
+        }
+        title.refresh_from_db()
+        assert title.reviews_count == 1
+
+    def test_04_comment_create(self, admin, user, user_client, client):
+        title, other_title = create_catalog(2)
+        review = Review.objects.create(
+            title=title, author=admin, text='Отзыв', score=5
+        )
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+        with CaptureQueriesContext(connection) as queries:
+            response = user_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == HTTPStatus.CREATED
+        parent_reads = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "users_user"' not in query['sql']
+        ]
+        assert len(parent_reads) == 1, (
+            'Проверьте, что отзыв и произведение комментария читаются '
+            'одним запросом.'
+        )
+
+        for wrong_url in (
+            f'/api/v1/titles/{other_title.id}/reviews/{review.id}/comments/',
+            f'/api/v1/titles/0/reviews/{review.id}/comments/',
+            f'/api/v1/titles/{title.id}/reviews/0/comments/',
+        ):
+            response = client.get(wrong_url)
+            assert response.status_code == HTTPStatus.NOT_FOUND
+
+    @pytest.mark.parametrize('size', (1, 6))
+    def test_05_review_and_comment_pages(self, client, django_user_model,
+                                         django_assert_num_queries, size):
+        title = create_catalog(1)[0]
+        authors = [
+            django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            for idx in range(size)
+        ]
+        reviews = [
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=5
+            )
+            for author in authors
+        ]
+        for author in authors:
+            reviews[0].comments.create(author=author, text='Комментарий')
+        reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0].id}/comments/'
+
+        # Родитель, валидаторы ETag, COUNT и страница с авторами.
+        for url in (reviews_url, comments_url):
+            with django_assert_num_queries(4):
+                response = client.get(f'{url}?limit=10')
+            results = response.json()['results']
+            assert len(results) == size
+            assert {item['author'] for item in results} == {
+                author.username for author in authors
+            }
+
+        comment_id = results[0]['id']
+        for url in (f'{reviews_url}{reviews[0].id}/',
+                    f'{comments_url}{comment_id}/'):
+            with django_assert_num_queries(3):
+                response = client.get(url)
+            assert response.json()['author'] in {
+                author.username for author in authors
+            }
+
+    def test_06_other_integrity_errors(self, user_client):
+        title = create_catalog(1)[0]
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        with mock.patch(
+            'reviews.signals.change_title_rating',
+            side_effect=IntegrityError('CHECK constraint failed'),
+        ):
+            with pytest.raises(IntegrityError):
+                user_client.post(url, data={'text': 'Отзыв', 'score': 7})
+        assert not Review.objects.exists()
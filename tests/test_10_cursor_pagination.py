@@ -0,0 +1,58 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    def create_reviews(self, django_user_model, count):
+        title = Title.objects.create(name='Произведение', year=2000)
+        for idx in range(count):
+            author = django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text=f'review {idx}', score=5
+            )
+        return title
+
+    def test_01_reviews_cursor_walk(self, client, django_user_model):
+        title = self.create_reviews(django_user_model, 12)
+        url = f'/api/v1/titles/{title.id}/reviews/?cursor='
+        seen = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data
+            seen.extend(review['id'] for review in data['results'])
+            url = data['next']
+        expected = list(
+            title.reviews.order_by('-pub_date', '-id')
+            .values_list('id', flat=True)
+        )
+        assert seen == expected, (
+            'Проверьте, что курсорная пагинация отзывов проходит все отзывы '
+            'без пропусков и повторов.'
+        )
+
+    def test_02_limit_offset_kept(self, client, django_user_model):
+        title = self.create_reviews(django_user_model, 7)
+        response = client.get(
+            f'/api/v1/titles/{title.id}/reviews/?limit=3&offset=3'
+        )
+        data = response.json()
+        assert data['count'] == 7
+        assert len(data['results']) == 3
+
+    def test_03_titles_cursor_limit(self, client):
+        for idx in range(4):
+            Title.objects.create(name=f'Произведение {idx}', year=2000)
+        response = client.get('/api/v1/titles/?cursor=&limit=3')
+        data = response.json()
+        assert len(data['results']) == 3
+        response = client.get(data['next'])
+        assert len(response.json()['results']) == 1
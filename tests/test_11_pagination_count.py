@@ -0,0 +1,50 @@
+import pytest
+
+from reviews.models import Category
+
+
+@pytest.fixture
+def categories():
+    return [
+        Category.objects.create(name=f'Категория {idx}', slug=f'cat-{idx}')
+        for idx in range(6)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11PaginationCount:
+
+    def test_01_small_count_is_exact(self, client, categories):
+        response = client.get('/api/v1/categories/')
+        assert response.json()['count'] == 6
+        categories[0].delete()
+        response = client.get('/api/v1/categories/')
+        assert response.json()['count'] == 5
+
+    def test_02_large_count_is_cached(self, client, categories, settings,
+                                      django_assert_num_queries):
+        settings.PAGINATION_COUNT_THRESHOLD = 3
+        response = client.get('/api/v1/categories/')
+        assert response.json()['count'] == 6
+        categories[0].delete()
+        with django_assert_num_queries(1):
+            response = client.get('/api/v1/categories/?limit=2')
+        assert response.json()['count'] == 6, (
+            'Проверьте, что количество объектов выше порога берётся из кэша.'
+        )
+        response = client.get('/api/v1/categories/?search=Категория 1')
+        assert response.json()['count'] == 1
+
+    def test_03_count_can_be_skipped(self, client, categories,
+                                     django_assert_num_queries):
+        with django_assert_num_queries(1):
+            response = client.get('/api/v1/categories/?count=false&limit=4')
+        data = response.json()
+        assert 'count' not in data
+        assert len(data['results']) == 4
+        assert data['next']
+        response = client.get(data['next'])
+        data = response.json()
+        assert len(data['results']) == 2
+        assert data['next'] is None
+        assert data['previous']
@@ -0,0 +1,68 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Genre
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ResponseCache:
+
+    def test_01_titles_cached_until_change(self, client, admin_client,
+                                           user_client,
+                                           django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        response = client.get(url)
+        assert response.json()['rating'] is None
+        with django_assert_num_queries(0):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['name'] == titles[0]['name']
+
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 7)
+        response = client.get(url)
+        assert response.json()['rating'] == 7, (
+            'Проверьте, что кэш произведения сбрасывается при изменении '
+            'отзывов.'
+        )
+
+        client.get('/api/v1/titles/')
+        admin_client.patch(url, data={'genre': ['drama']})
+        response = client.get('/api/v1/titles/')
+        title = next(
+            item for item in response.json()['results']
+            if item['id'] == titles[0]['id']
+        )
+        assert [genre['slug'] for genre in title['genre']] == ['drama']
+
+    def test_02_genres_cached_until_change(self, client, admin_client,
+                                           django_assert_num_queries):
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Ужасы', 'slug': 'horror'}
+        )
+        client.get('/api/v1/genres/')
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/genres/')
+        assert response.json()['count'] == 1
+
+        admin_client.delete('/api/v1/genres/horror/')
+        response = client.get('/api/v1/genres/')
+        assert response.json()['count'] == 0
+
+    def test_03_no_cache_without_shared_versions(self, client, admin_client,
+                                                 settings):
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'
+        }}
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Ужасы', 'slug': 'horror'}
+        )
+        client.get('/api/v1/genres/')
+        # Правка в другом процессе не меняет версии в этом.
+        Genre.objects.filter(slug='horror').update(name='Драма')
+        response = client.get('/api/v1/genres/')
+        assert response.json()['results'][0]['name'] == 'Драма', (
+            'Проверьте, что с кэшем процесса ответы не кэшируются.'
+        )
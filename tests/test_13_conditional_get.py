@@ -0,0 +1,80 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ConditionalGet:
+
+    def test_01_reviews_not_modified(self, client, admin_client, admin,
+                                     user, user_client,
+                                     django_assert_num_queries):
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = client.get(url)
+        etag = response['ETag']
+        assert etag and response['Last-Modified']
+
+        # Родительское произведение и агрегаты, без страницы и COUNT.
+        with django_assert_num_queries(2):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert response['ETag'] == etag
+
+        user_client.patch(f'{url}{reviews[1]["id"]}/', data={'text': 'new'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения отзыва ETag списка меняется.'
+        )
+        assert response['ETag'] != etag
+
+    def test_02_comments_and_titles(self, client, admin_client, admin, user,
+                                    user_client):
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/'
+        )
+        response = client.get(url)
+        last_modified = response['Last-Modified']
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        etag = client.get(title_url)['ETag']
+        response = client.get(title_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        admin_client.patch(title_url, data={'name': 'Новое название'})
+        response = client.get(title_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['name'] == 'Новое название'
+
+        response = client.get(
+            '/api/v1/titles/0/reviews/', HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_validators_need_shared_versions(self, client, admin_client,
+                                                settings):
+        titles, _, _ = create_titles(admin_client)
+        first = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        second = client.get(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert first['ETag'] != second['ETag'], (
+            'Проверьте, что ETag произведения включает его pk.'
+        )
+
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'
+        }}
+        response = client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/',
+            HTTP_IF_NONE_MATCH=first['ETag'],
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert not response.has_header('ETag'), (
+            'Проверьте, что без общих версий ETag не выдаётся.'
+        )
@@ -0,0 +1,44 @@
+import pytest
+
+from reviews.models import Category, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14TitleSearch:
+
+    def search(self, client, query):
+        response = client.get(f'/api/v1/titles/?{query}')
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_full_text_search(self, client):
+        films = Category.objects.create(name='Фильмы', slug='films')
+        books = Category.objects.create(name='Книги', slug='books')
+        Title.objects.create(
+            name='Крепкий орешек', year=1988, category=films,
+            description='Полицейский против террористов.'
+        )
+        Title.objects.create(
+            name='Орешек знаний', year=2001, category=books,
+            description='Сборник задач.'
+        )
+        title = Title.objects.create(
+            name='Терминатор', year=1984, category=films,
+            description='Кибер-орешек из будущего.'
+        )
+
+        assert self.search(client, 'q=ОРЕШ') == [
+            'Орешек знаний', 'Крепкий орешек', 'Терминатор'
+        ]
+        assert self.search(client, 'q=орешек&category=films') == [
+            'Крепкий орешек', 'Терминатор'
+        ]
+        assert self.search(client, 'q=полицейский террористов') == [
+            'Крепкий орешек'
+        ]
+        assert self.search(client, 'q="*') == []
+
+        title.description = 'Робот из будущего.'
+        title.save()
+        assert 'Терминатор' not in self.search(client, 'q=орешек')
+        title.delete()
+        assert self.search(client, 'q=будущего') == []
@@ -0,0 +1,48 @@
+import pytest
+
+from reviews.models import Category, Genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15NameSearch:
+
+    def search(self, client, url, term):
+        response = client.get(url, {'search': term})
+        return sorted(item['slug'] for item in response.json()['results'])
+
+    def test_01_genre_search_casefold(self, client,
+                                      django_assert_num_queries):
+        Genre.objects.create(name='Ужасы', slug='horror')
+        Genre.objects.create(name='Комедия ужасов', slug='horror-comedy')
+        Genre.objects.create(name='Драма', slug='drama')
+        url = '/api/v1/genres/'
+
+        assert self.search(client, url, 'УЖАС') == ['horror', 'horror-comedy']
+        assert self.search(client, url, 'ужасов') == ['horror-comedy']
+        assert self.search(client, url, 'ма') == ['drama']
+        assert self.search(client, url, 'комедия ужас') == ['horror-comedy']
+        assert self.search(client, url, 'вестерн') == []
+        # Индекс уже построен: только COUNT и страница по pk.
+        with django_assert_num_queries(2):
+            client.get(url, {'search': 'др'})
+
+        Genre.objects.filter(slug='drama').update(name='Исторический')
+        Genre.objects.create(name='Мелодрама', slug='melodrama')
+        assert self.search(client, url, 'драма') == ['melodrama']
+
+    def test_02_category_search(self, client):
+        Category.objects.create(name='Фильмы', slug='films')
+        Category.objects.create(name='Книги', slug='books')
+        assert self.search(client, '/api/v1/categories/', 'ФИЛЬМ') == [
+            'films'
+        ]
+
+    def test_03_index_max_age(self, client, settings):
+        Genre.objects.create(name='Драма', slug='drama')
+        url = '/api/v1/genres/'
+        assert self.search(client, url, 'драма') == ['drama']
+        # Запись из другого процесса не меняет версию в кэше этого.
+        Genre.objects.filter(slug='drama').update(name='Вестерн')
+        settings.RESPONSE_CACHE_TIMEOUT = 0
+        assert self.search(client, url, 'драм') == []
+        assert self.search(client, url, 'вестерн') == ['drama']
@@ -0,0 +1,106 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+
+
+@pytest.fixture
+def catalog():
+    Category.objects.create(name='Фильмы', slug='films')
+    return [
+        Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+        for idx in range(12)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TitleWrite:
+
+    def post_title(self, admin_client, genres):
+        data = {
+            'name': 'Произведение',
+            'year': 2000,
+            'category': 'films',
+            'genre': genres,
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post('/api/v1/titles/', data=data)
+        assert response.status_code == HTTPStatus.CREATED
+        return response.json(), len(queries)
+
+    def test_01_create_queries_do_not_grow(self, admin_client, catalog):
+        # Версия прав пользователя попадает в общий кэш до замеров.
+        admin_client.get('/api/v1/users/me/')
+        _, one_genre = self.post_title(admin_client, ['genre-0'])
+        data, many_genres = self.post_title(
+            admin_client, [genre.slug for genre in catalog]
+        )
+        assert one_genre == many_genres, (
+            'Проверьте, что жанры произведения разрешаются одним запросом.'
+        )
+        assert sorted(data['genre']) == sorted(
+            genre.slug for genre in catalog
+        )
+
+    def test_02_unknown_slugs_reported(self, admin_client, catalog):
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Произведение',
+            'year': 2000,
+            'category': 'films',
+            'genre': ['genre-0', 'missing-1', 'missing-2'],
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()['genre']
+        assert len(errors) == 2
+        assert 'missing-1' in errors[0] and 'missing-2' in errors[1]
+
+    def test_03_patch_genres(self, admin_client, catalog):
+        data, _ = self.post_title(admin_client, ['genre-0', 'genre-1'])
+        response = admin_client.patch(
+            f'/api/v1/titles/{data["id"]}/',
+            data={'genre': ['genre-1', 'genre-2']},
+        )
+        assert response.status_code == HTTPStatus.OK
+        title = Title.objects.get(pk=data['id'])
+        assert sorted(title.genre.values_list('slug', flat=True)) == [
+            'genre-1', 'genre-2'
+        ]
+        assert sorted(response.json()['genre']) == ['genre-1', 'genre-2']
+
+    def test_04_bulk_create(self, admin_client, user_client, catalog,
+                            django_assert_max_num_queries):
+        items = [
+            {
+                'name': f'Произведение {idx}',
+                'year': 2000 + idx,
+                'category': 'films',
+                'genre': [genre.slug for genre in catalog[idx:idx + 3]],
+            }
+            for idx in range(5)
+        ]
+        items.append({'name': 'Без жанра', 'year': 2000, 'genre': ['nope']})
+        url = '/api/v1/titles/bulk/'
+        response = user_client.post(url, data=items, format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        # Пользователь, два запроса slug, BEGIN, вставка произведений,
+        # поиск их pk и одна вставка связей с жанрами.
+        with django_assert_max_num_queries(7):
+            response = admin_client.post(url, data=items, format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        results = response.json()
+        assert [item['status'] for item in results] == [201] * 5 + [400]
+        assert set(results[-1]['errors']) == {'genre', 'category'}
+        for item, result in zip(items[:5], results):
+            title = Title.objects.get(pk=result['data']['id'])
+            assert title.name == item['name']
+            assert sorted(title.genre.values_list('slug', flat=True)) == (
+                sorted(item['genre'])
+            )
+            assert result['data']['genre'] == item['genre']
+
+        response = admin_client.post(url, data=items[-1:], format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
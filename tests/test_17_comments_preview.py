@@ -0,0 +1,71 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Review, Title
+
+
+@pytest.fixture
+def reviews(django_user_model):
+    title = Title.objects.create(name='Произведение', year=2000)
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+        )
+        for idx in range(4)
+    ]
+    result = []
+    for idx, author in enumerate(authors):
+        review = Review.objects.create(
+            title=title, author=author, text=f'Отзыв {idx}', score=5
+        )
+        for commenter in authors[:idx + 1]:
+            review.comments.create(
+                author=commenter, text=f'{review.text}: {commenter.username}'
+            )
+        result.append(review)
+    return result
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17CommentsPreview:
+
+    def test_01_preview(self, client, reviews, django_assert_num_queries):
+        url = f'/api/v1/titles/{reviews[0].title_id}/reviews/'
+        response = client.get(url)
+        assert 'comments_count' not in response.json()['results'][0]
+
+        # Произведение, валидаторы, COUNT, страница и комментарии.
+        with django_assert_num_queries(5):
+            response = client.get(f'{url}?comments_preview=2')
+        assert response.status_code == HTTPStatus.OK
+        for item in response.json()['results']:
+            review = next(r for r in reviews if r.id == item['id'])
+            expected = list(
+                review.comments.order_by('-pub_date', '-id')
+                .values_list('text', flat=True)[:2]
+            )
+            assert item['comments_count'] == review.comments.count()
+            assert [c['text'] for c in item['latest_comments']] == expected
+            assert all(c['author'] for c in item['latest_comments'])
+
+        response = client.get(f'{url}?comments_preview=0')
+        item = response.json()['results'][0]
+        assert item['comments_count'] and item['latest_comments'] == []
+
+        response = client.get(f'{url}?comments_preview=100')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_preview_etag_follows_comments(self, client, reviews):
+        url = (
+            f'/api/v1/titles/{reviews[0].title_id}/reviews/'
+            '?comments_preview=1'
+        )
+        etag = client.get(url)['ETag']
+        reviews[0].comments.create(author=reviews[1].author, text='Новый')
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        item = next(
+            r for r in response.json()['results'] if r['id'] == reviews[0].id
+        )
+        assert item['latest_comments'][0]['text'] == 'Новый'
@@ -0,0 +1,91 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Category, Genre, Review, Title, TitleRanking
+
+
+@pytest.fixture
+def rated_titles(django_user_model):
+    films = Category.objects.create(name='Фильмы', slug='films')
+    books = Category.objects.create(name='Книги', slug='books')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+        )
+        for idx in range(5)
+    ]
+    single = Title.objects.create(name='Одна десятка', year=2000,
+                                  category=films)
+    single.genre.set([drama])
+    popular = Title.objects.create(name='Много девяток', year=2000,
+                                   category=books)
+    popular.genre.set([drama, comedy])
+    weak = Title.objects.create(name='Слабое', year=2000, category=films)
+    weak.genre.set([comedy])
+    scores = {single: [10], popular: [10, 10, 9, 9, 9], weak: [2, 2, 2]}
+    for title, title_scores in scores.items():
+        for author, score in zip(authors, title_scores):
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=score
+            )
+    return single, popular, weak
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Leaderboard:
+
+    def names(self, client, query=''):
+        response = client.get(f'/api/v1/titles/leaderboard/{query}')
+        assert response.status_code == HTTPStatus.OK
+        return [item['title']['name'] for item in response.json()['results']]
+
+    def test_01_bayesian_order(self, client, rated_titles):
+        single, popular, weak = rated_titles
+        assert self.names(client) == [popular.name, single.name, weak.name], (
+            'Проверьте, что произведение с одной высокой оценкой не '
+            'обгоняет произведение с множеством высоких оценок.'
+        )
+        assert self.names(client, '?category=films') == [
+            single.name, weak.name
+        ]
+        assert self.names(client, '?genre=comedy') == [popular.name, weak.name]
+        # Общее среднее кэшируется, команда пересчитывает его заново.
+        call_command('rebuild_ratings')
+        response = client.get('/api/v1/titles/leaderboard/')
+        item = response.json()['results'][0]
+        assert item['score'] == pytest.approx((47 + 10 * 7) / 15)
+        assert item['title']['rating'] == 9
+
+    def test_02_rankings_follow_changes(self, client, admin_client,
+                                        rated_titles):
+        single, popular, weak = rated_titles
+        for review in weak.reviews.all():
+            review.score = 10
+            review.save()
+        assert self.names(client, '?category=films')[0] == weak.name
+
+        response = admin_client.patch(
+            f'/api/v1/titles/{single.id}/',
+            data={'category': 'books', 'genre': ['comedy']},
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert single.name in self.names(client, '?category=books')
+        assert single.name in self.names(client, '?genre=comedy')
+        assert single.name not in self.names(client, '?genre=drama')
+
+        single.reviews.all().delete()
+        assert single.name not in self.names(client)
+        popular.delete()
+        assert self.names(client) == [weak.name]
+
+        expected = set(
+            TitleRanking.objects.values_list('title', 'category', 'genre')
+        )
+        call_command('rebuild_ratings')
+        assert set(
+            TitleRanking.objects.values_list('title', 'category', 'genre')
+        ) == expected
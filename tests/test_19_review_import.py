@@ -0,0 +1,97 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review, Title, TitleRanking, TitleRatingStats
+
+
+@pytest.fixture
+def import_data(django_user_model):
+    titles = [
+        Title.objects.create(name=f'Произведение {idx}', year=2000)
+        for idx in range(2)
+    ]
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+        )
+        for idx in range(3)
+    ]
+    Review.objects.create(
+        title=titles[0], author=authors[0], text='Старый отзыв', score=2
+    )
+    return titles, authors
+
+
+def write_jsonl(path, rows):
+    path.write_text(
+        '\n'.join(json.dumps(row, ensure_ascii=False) for row in rows),
+        encoding='utf-8',
+    )
+    return str(path)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19ReviewImport:
+
+    def rows(self, titles, authors):
+        return [
+            {'title_id': titles[0].id, 'author': authors[0].id,
+             'text': 'Новый отзыв', 'score': 9},
+            {'title_id': titles[0].id, 'author': authors[1].id,
+             'text': 'Отзыв', 'score': '7'},
+            {'title_id': titles[1].id, 'author': authors[1].id,
+             'text': 'Отзыв', 'score': 5},
+            {'title_id': titles[1].id, 'author': authors[2].id,
+             'text': 'Отзыв', 'score': 11},
+            {'title_id': 0, 'author': authors[2].id,
+             'text': 'Отзыв', 'score': 5},
+            {'title_id': titles[1].id, 'author': authors[2].id,
+             'text': '', 'score': 5},
+        ]
+
+    def test_01_skip_conflicts(self, tmp_path, capsys, import_data):
+        titles, authors = import_data
+        path = write_jsonl(tmp_path / 'reviews.jsonl',
+                           self.rows(titles, authors))
+        call_command('import_reviews', path, batch_size=2)
+        out, err = capsys.readouterr()
+        assert 'Создано отзывов: 2, обновлено: 0, пропущено: 1, ' \
+               'отклонено: 3' in out
+        assert 'Запись 4: Значение не должно быть больше 10' in err
+        assert 'Запись 5: Произведение 0 не найдено.' in err
+        assert Review.objects.count() == 3
+        assert Review.objects.get(author=authors[0]).score == 2
+        title = Title.objects.get(pk=titles[0].pk)
+        assert (title.score_sum, title.reviews_count) == (9, 2)
+        assert TitleRatingStats.objects.get(title=titles[1]).score_5 == 1
+        assert TitleRanking.objects.filter(title=titles[1]).exists()
+        call_command('rebuild_ratings', check=True)
+
+    def test_02_update_conflicts(self, tmp_path, capsys, import_data):
+        titles, authors = import_data
+        path = write_jsonl(tmp_path / 'reviews.jsonl',
+                           self.rows(titles, authors))
+        call_command('import_reviews', path, on_conflict='update')
+        out, _ = capsys.readouterr()
+        assert 'Создано отзывов: 2, обновлено: 1, пропущено: 0' in out
+        review = Review.objects.get(author=authors[0])
+        assert (review.text, review.score) == ('Новый отзыв', 9)
+        title = Title.objects.get(pk=titles[0].pk)
+        assert (title.score_sum, title.reviews_count) == (16, 2)
+        stats = TitleRatingStats.objects.get(title=titles[0])
+        assert (stats.score_2, stats.score_9) == (0, 1)
+        call_command('rebuild_ratings', check=True)
+
+    def test_03_csv(self, tmp_path, capsys, import_data):
+        titles, authors = import_data
+        path = tmp_path / 'reviews.csv'
+        path.write_text(
+            'id,title_id,text,author,score\n'
+            f'1,{titles[1].id},"Много\nстрок",{authors[0].id},8\n',
+            encoding='utf-8',
+        )
+        call_command('import_reviews', str(path))
+        assert Review.objects.get(title=titles[1]).text == 'Много\nстрок'
+        call_command('rebuild_ratings', check=True)
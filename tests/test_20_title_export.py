@@ -0,0 +1,76 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Comment, Review, Title
+
+
+@pytest.fixture
+def export_data(django_user_model):
+    title, other = [
+        Title.objects.create(name=f'Произведение {idx}', year=2000)
+        for idx in range(2)
+    ]
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+        )
+        for idx in range(3)
+    ]
+    reviews = [
+        Review.objects.create(
+            title=title, author=author, text=f'Отзыв {idx}', score=idx + 1
+        )
+        for idx, author in enumerate(authors)
+    ]
+    other_review = Review.objects.create(
+        title=other, author=authors[0], text='Чужой отзыв', score=5
+    )
+    comments = (
+        (reviews[2], authors[1]),
+        (other_review, authors[1]),
+        (reviews[0], authors[1]),
+        (reviews[2], authors[0]),
+    )
+    for review, author in comments:
+        Comment.objects.create(
+            review=review, author=author, text=f'К отзыву {review.id}'
+        )
+    return title, reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20TitleExport:
+
+    def test_01_export(self, client, export_data, django_assert_num_queries):
+        title, reviews = export_data
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/{title.id}/export/')
+            assert response.status_code == HTTPStatus.OK
+            assert response.streaming, 'Экспорт должен отдаваться потоком.'
+            lines = b''.join(response.streaming_content).decode().split('\n')
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        assert lines[-1] == ''
+        exported = [json.loads(line) for line in lines[:-1]]
+        assert [item['id'] for item in exported] == [
+            review.id for review in reviews
+        ]
+        assert exported[0]['author'] == 'author0'
+        assert exported[0]['score'] == 1
+        assert [len(item['comments']) for item in exported] == [1, 0, 2]
+        assert exported[2]['comments'][0] == {
+            'id': exported[2]['comments'][0]['id'],
+            'text': f'К отзыву {reviews[2].id}',
+            'author': 'author1',
+            'pub_date': exported[2]['comments'][0]['pub_date'],
+        }
+
+    def test_02_permissions(self, client, admin_client, export_data):
+        title, _ = export_data
+        response = client.post(f'/api/v1/titles/{title.id}/export/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        response = admin_client.get('/api/v1/titles/0/export/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        response = admin_client.get('/api/v1/titles/abc/export/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
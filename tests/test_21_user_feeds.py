@@ -0,0 +1,84 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+
+from reviews.models import Comment, Review, Title
+
+
+@pytest.fixture
+def feeds(user, admin):
+    titles = [
+        Title.objects.create(name=f'Произведение {idx}', year=2000)
+        for idx in range(3)
+    ]
+    own = [
+        Review.objects.create(
+            title=title, author=user, text=f'Мой отзыв {idx}', score=5
+        )
+        for idx, title in enumerate(titles)
+    ]
+    foreign = Review.objects.create(
+        title=titles[0], author=admin, text='Чужой отзыв', score=7
+    )
+    comments = [
+        Comment.objects.create(review=review, author=user, text='Мой')
+        for review in (foreign, own[1])
+    ]
+    Comment.objects.create(review=own[0], author=admin, text='Чужой')
+    return own, comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21UserFeeds:
+
+    def test_01_my_reviews(self, client, user_client, feeds):
+        own, _ = feeds
+        response = client.get('/api/v1/users/me/reviews/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        response = user_client.get('/api/v1/users/me/reviews/')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['count'] == 3
+        assert [item['id'] for item in data['results']] == [
+            review.id for review in reversed(own)
+        ]
+        assert data['results'][0]['title'] == own[-1].title_id
+        assert data['results'][0]['author'] == own[-1].author.username
+
+    def test_02_my_comments_keyset(self, user_client, feeds):
+        _, comments = feeds
+        url = '/api/v1/users/me/comments/?cursor=&limit=1'
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        first = response.json()
+        assert [item['id'] for item in first['results']] == [comments[1].id]
+        assert first['results'][0]['review'] == comments[1].review_id
+        assert first['results'][0]['title'] == comments[1].review.title_id
+        response = user_client.get(first['next'])
+        assert [item['id'] for item in response.json()['results']] == [
+            comments[0].id
+        ]
+
+    @pytest.mark.skipif(connection.vendor != 'sqlite',
+                        reason='План запроса SQLite')
+    def test_03_feed_uses_index(self, user, feeds):
+        for model, index in ((Review, 'review_author_pub_date_idx'),
+                             (Comment, 'comment_author_pub_date_idx')):
+            queryset = model.objects.filter(author=user).order_by(
+                '-pub_date', '-id'
+            )
+            plan = queryset.explain()
+            assert index in plan
+            assert 'TEMP B-TREE' not in plan, (
+                'Проверьте, что лента пользователя не сортируется '
+                'во временном дереве.'
+            )
+
+    def test_04_count_cache_per_user(self, settings, user_client,
+                                     admin_client, feeds):
+        settings.PAGINATION_COUNT_THRESHOLD = 1
+        url = '/api/v1/users/me/reviews/'
+        assert user_client.get(url).json()['count'] == 3
+        assert admin_client.get(url).json()['count'] == 1
+        assert user_client.get(url).json()['count'] == 3
@@ -0,0 +1,48 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title
+
+
+def list_query_plans(client, url):
+    """Планы запросов страницы списка, отсортированных в базе."""
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url)
+    plans = []
+    with connection.cursor() as cursor:
+        for query in queries.captured_queries:
+            if 'ORDER BY' not in query['sql']:
+                continue
+            cursor.execute(f"EXPLAIN QUERY PLAN {query['sql']}")
+            plans.append(' '.join(row[-1] for row in cursor.fetchall()))
+    return plans
+
+
+@pytest.mark.skipif(connection.vendor != 'sqlite',
+                    reason='План запроса SQLite')
+@pytest.mark.django_db(transaction=True)
+class Test22NestedListPlan:
+
+    @pytest.mark.parametrize('query', ['', '?cursor='])
+    def test_01_lists_use_parent_index(self, client, user, admin, query):
+        title = Title.objects.create(name='Произведение', year=2000)
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5
+        )
+        Review.objects.create(title=title, author=admin, text='Ещё', score=1)
+        Comment.objects.create(review=review, author=admin, text='Коммент')
+        base = f'/api/v1/titles/{title.id}/reviews/'
+        lists = (
+            (base, 'review_title_pub_date_idx'),
+            (f'{base}{review.id}/comments/', 'comment_review_pub_date_idx'),
+        )
+        for url, index in lists:
+            plans = list_query_plans(client, url + query)
+            assert plans, f'Не найден запрос страницы {url}.'
+            for plan in plans:
+                assert index in plan, plan
+                assert 'TEMP B-TREE' not in plan, (
+                    'Проверьте, что список не сортируется во временном '
+                    f'дереве: {plan}'
+                )
@@ -0,0 +1,155 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.v1.authentication import ClaimsJWTAuthentication, ClaimsUser
+from users.cache import user_cache
+from users.models import User
+from users.signals import bump_access_version
+
+
+def bearer_client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+def user_reads(queries):
+    return [
+        query['sql'] for query in queries.captured_queries
+        if 'FROM "users_user"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23JwtClaims:
+
+    def obtain_token(self, client, user):
+        response = client.post('/api/v1/auth/token/', data={
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        })
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['token']
+
+    def test_01_token_claims(self, client, admin):
+        token = AccessToken(self.obtain_token(client, admin))
+        assert token['role'] == 'admin'
+        assert token['is_staff'] is False
+        assert token['is_superuser'] is False
+        assert token['access_version'] == admin.access_version
+        request_user = ClaimsJWTAuthentication().get_user(token)
+        assert isinstance(request_user, ClaimsUser)
+        assert request_user.username == admin.username
+
+    def test_02_permissions_without_user_query(self, client, admin):
+        admin_client = bearer_client(self.obtain_token(client, admin))
+        # Первый запрос читает версию прав из базы в общий кэш.
+        admin_client.get('/api/v1/users/me/')
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post(
+                '/api/v1/genres/', data={'name': 'Драма', 'slug': 'drama'}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        assert not user_reads(queries), (
+            'Проверьте, что права проверяются по claims токена без '
+            'запроса пользователя.'
+        )
+
+    def test_03_role_change_revokes_claims(self, client, admin_client,
+                                           user):
+        user_client = bearer_client(self.obtain_token(client, user))
+        data = {'name': 'Драма', 'slug': 'drama'}
+        response = user_client.post('/api/v1/genres/', data=data)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = user_client.post('/api/v1/genres/', data=data)
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что после смены роли токен со старыми claims '
+            'проверяется по пользователю из базы.'
+        )
+
+        user.refresh_from_db()
+        user.role = 'user'
+        user.save()
+        response = user_client.delete('/api/v1/genres/drama/')
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+    def test_04_user_cache(self, user, user_client):
+        # Токен без claims: пользователь берётся из кэша процесса.
+        client = bearer_client(AccessToken.for_user(user))
+        client.get('/api/v1/users/me/')
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/v1/users/me/')
+        assert response.json()['username'] == user.username
+        assert not user_reads(queries)
+
+        response = user_client.patch(
+            '/api/v1/users/me/', data={'bio': 'Новое описание'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert client.get('/api/v1/users/me/').json()['bio'] == (
+            'Новое описание'
+        )
+        user.delete()
+        assert user_cache.get(user.pk) is None
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_05_revocation_survives_cache_eviction(self, client, admin):
+        admin_client = bearer_client(self.obtain_token(client, admin))
+        assert admin_client.get('/api/v1/users/').status_code == (
+            HTTPStatus.OK
+        )
+        admin.role = 'user'
+        admin.save()
+        cache.clear()
+        response = admin_client.get('/api/v1/users/')
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что отзыв claims не хранится в вытесняемом кэше.'
+        )
+
+    def test_06_change_from_other_process(self, client, user,
+                                          django_assert_num_queries):
+        user_client = bearer_client(self.obtain_token(client, user))
+        user_client.get('/api/v1/genres/')
+        # Claims и версия из общего кэша, ответ из кэша ответов.
+        with django_assert_num_queries(0):
+            user_client.get('/api/v1/genres/')
+        # Сохранение в другом процессе: строка и общая версия прав
+        # меняются, кэш пользователей этого процесса - нет.
+        User.objects.filter(pk=user.pk).update(role='admin')
+        bump_access_version(user)
+        response = user_client.post(
+            '/api/v1/genres/', data={'name': 'Драма', 'slug': 'drama'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+
+    def test_07_patch_me_saves_fresh_row(self, client, admin):
+        admin_client = bearer_client(self.obtain_token(client, admin))
+        admin_client.get('/api/v1/users/me/')
+        # Понижение в другом процессе: кэш этого процесса его не видит.
+        User.objects.filter(pk=admin.pk).update(
+            role='user', access_version=F('access_version') + 1
+        )
+        response = admin_client.patch(
+            '/api/v1/users/me/', data={'bio': 'Новое описание'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        admin = User.objects.get(pk=admin.pk)
+        assert admin.role == 'user'
+        assert admin.access_version == 1
+        assert admin.bio == 'Новое описание'
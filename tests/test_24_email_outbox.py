@@ -0,0 +1,114 @@
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+
+from users.models import OutgoingEmail
+from users.outbox import drain_outbox
+
+
+class DroppingBackend(BaseEmailBackend):
+    """Как SMTP: open() не замечает соединения, оборванного сервером."""
+
+    connections = 0
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.connection = None
+
+    def open(self):
+        if self.connection:
+            return False
+        DroppingBackend.connections += 1
+        self.connection = 'открыто'
+        return True
+
+    def close(self):
+        self.connection = None
+
+    def send_messages(self, email_messages):
+        if self.connection != 'открыто':
+            raise ConnectionResetError('соединение закрыто сервером')
+        # Сервер рвёт соединение после каждого письма.
+        self.connection = 'оборвано'
+        return len(email_messages)
+
+
+def signup(client, idx):
+    response = client.post('/api/v1/auth/signup/', data={
+        'email': f'user{idx}@yamdb.fake', 'username': f'user{idx}'
+    })
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24EmailOutbox:
+
+    def test_01_signup_only_enqueues(self, client, settings):
+        settings.OUTBOX_BATCH_SIZE = 2
+        for idx in range(3):
+            signup(client, idx)
+        assert not mail.outbox, 'Письмо не должно отправляться в запросе.'
+        assert OutgoingEmail.objects.filter(
+            status=OutgoingEmail.PENDING
+        ).count() == 3
+
+        opened = []
+        original_open = EmailBackend.open
+
+        def track_open(backend):
+            opened.append(backend)
+            return original_open(backend)
+
+        with mock.patch.object(EmailBackend, 'open', track_open):
+            call_command('send_outbox')
+        assert len({id(backend) for backend in opened}) == 1, (
+            'Проверьте, что все пачки отправляются через одно соединение.'
+        )
+        assert sorted(message.to[0] for message in mail.outbox) == [
+            f'user{idx}@yamdb.fake' for idx in range(3)
+        ]
+        assert not OutgoingEmail.objects.exclude(
+            status=OutgoingEmail.SENT
+        ).exists()
+
+    def test_02_retries(self, client, settings, capsys):
+        settings.OUTBOX_RETRY_DELAY = 0
+        settings.OUTBOX_MAX_ATTEMPTS = 2
+        signup(client, 0)
+        signup(client, 1)
+        with mock.patch.object(EmailBackend, 'send_messages',
+                               side_effect=ConnectionError('нет связи')):
+            call_command('send_outbox')
+        failed = OutgoingEmail.objects.filter(status=OutgoingEmail.FAILED)
+        assert failed.count() == 2
+        assert all(email.attempts == 2 for email in failed)
+        assert 'ConnectionError' in failed.first().last_error
+
+        capsys.readouterr()
+        failed.update(status=OutgoingEmail.PENDING, attempts=0)
+        call_command('send_outbox')
+        out, _ = capsys.readouterr()
+        assert 'Отправлено писем: 2, ошибок: 0' in out
+        assert 'В очереди: 0, не отправлено: 0' in out
+        assert len(mail.outbox) == 2
+
+    def test_03_reconnect_after_drop(self, client, monkeypatch):
+        monkeypatch.setattr(DroppingBackend, 'connections', 0)
+        for idx in range(3):
+            signup(client, idx)
+        connection = get_connection(
+            'tests.test_24_email_outbox.DroppingBackend'
+        )
+        connection.open()
+        # Второе письмо уходит в оборванное соединение, третье - в новое.
+        assert drain_outbox(connection) == (2, 1), (
+            'Проверьте, что после ошибки отправки соединение открывается '
+            'заново.'
+        )
+        assert DroppingBackend.connections == 2
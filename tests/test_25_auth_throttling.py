@@ -0,0 +1,98 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.v1.throttling import MemoryBuckets
+
+
+class Test25TokenBuckets:
+
+    def test_01_refill(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr('api.v1.throttling.time.monotonic',
+                            lambda: now[0])
+        buckets = MemoryBuckets(shards=4, max_keys=8)
+        assert [buckets.consume('ip:1', 2, 1.0) for _ in range(3)] == [
+            0, 0, 1.0
+        ]
+        now[0] += 0.5
+        assert buckets.consume('ip:1', 2, 1.0) == pytest.approx(0.5)
+        assert buckets.consume('ip:2', 2, 1.0) == 0
+        now[0] += 1
+        assert buckets.consume('ip:1', 2, 1.0) == 0
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25AuthThrottling:
+
+    url = '/api/v1/auth/signup/'
+
+    def signup(self, client, idx, email=None, **extra):
+        return client.post(self.url, data={
+            'email': email or f'user{idx}@yamdb.fake',
+            'username': f'user{idx}',
+        }, **extra)
+
+    def test_02_email_limit(self, client, settings):
+        settings.AUTH_RATE_LIMITS = {
+            'auth-ip': '100/min', 'auth-email': '2/min',
+            'auth-username': '100/min',
+        }
+        for idx in range(2):
+            response = self.signup(client, idx, email='same@yamdb.fake')
+            assert response.status_code != HTTPStatus.TOO_MANY_REQUESTS
+        response = self.signup(client, 2, email='SAME@yamdb.fake')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert 1 <= int(response['Retry-After']) <= 30
+        response = self.signup(client, 3)
+        assert response.status_code == HTTPStatus.OK
+
+    @pytest.mark.parametrize('backend', ['memory', 'cache'])
+    def test_03_ip_limit(self, client, settings, backend):
+        settings.AUTH_RATE_LIMIT_BACKEND = backend
+        settings.AUTH_RATE_LIMITS = {
+            'auth-ip': '3/h', 'auth-email': '100/min',
+            'auth-username': '100/min',
+        }
+        for idx in range(3):
+            assert self.signup(client, idx).status_code == HTTPStatus.OK
+        response = client.post('/api/v1/auth/token/', data={
+            'username': 'user0', 'confirmation_code': 'wrong'
+        })
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert int(response['Retry-After']) == 1200
+        response = self.signup(client, 4, REMOTE_ADDR='10.0.0.2')
+        assert response.status_code == HTTPStatus.OK
+
+    def test_04_spoofed_forwarded_for(self, client, settings):
+        settings.AUTH_RATE_LIMITS = {
+            'auth-ip': '2/h', 'auth-email': '100/min',
+            'auth-username': '100/min',
+        }
+        statuses = [
+            self.signup(
+                client, idx, HTTP_X_FORWARDED_FOR=f'10.1.0.{idx}'
+            ).status_code
+            for idx in range(3)
+        ]
+        assert statuses[-1] == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что подделанный X-Forwarded-For не обходит '
+            'ограничение по IP.'
+        )
+
+        # За одним доверенным прокси клиент - последний адрес в цепочке.
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK, 'NUM_PROXIES': 1
+        }
+        response = self.signup(
+            client, 3, HTTP_X_FORWARDED_FOR='10.9.9.9, 10.2.0.1'
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = self.signup(
+            client, 4, HTTP_X_FORWARDED_FOR='10.9.9.8, 10.2.0.1'
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = self.signup(
+            client, 5, HTTP_X_FORWARDED_FOR='10.9.9.7, 10.2.0.1'
+        )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
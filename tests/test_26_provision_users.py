@@ -0,0 +1,80 @@
+import re
+from unittest import mock
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26ProvisionUsers:
+
+    def test_01_provision(self, tmp_path, capsys, user, admin,
+                          django_user_model):
+        path = tmp_path / 'users.csv'
+        path.write_text(
+            'username,email\n'
+            'partner0,partner0@yamdb.fake\n'
+            'partner1,partner1@yamdb.fake\n'
+            'me,me@yamdb.fake\n'
+            'partner2,not-an-email\n'
+            f'{user.username},{user.email}\n'
+            f'partner4,{admin.email}\n'
+            'partner0,again@yamdb.fake\n'
+            'partner3,partner3@yamdb.fake\n',
+            encoding='utf-8',
+        )
+        opened = []
+        original_open = EmailBackend.open
+
+        def track_open(backend):
+            opened.append(backend)
+            return original_open(backend)
+
+        with mock.patch.object(EmailBackend, 'open', track_open):
+            call_command('provision_users', str(path), batch_size=3)
+        out, err = capsys.readouterr()
+        assert 'Создано пользователей: 3, уже существовало: 1, ' \
+               'отклонено: 4, отправлено писем: 3.' in out
+        assert 'Запись 3: username: Использовать имя me запрещено' in err
+        assert 'Запись 6: Имя или адрес уже заняты.' in err
+        assert 'Запись 7: Повтор в файле.' in err
+        assert len(opened) == 1, (
+            'Проверьте, что письма всех пачек идут через одно соединение.'
+        )
+
+        assert sorted(message.to[0] for message in mail.outbox) == [
+            f'partner{idx}@yamdb.fake' for idx in (0, 1, 3)
+        ]
+        for message in mail.outbox:
+            code = re.search(r'Код подтверждения: (\S+)', message.body)[1]
+            provisioned = django_user_model.objects.get(email=message.to[0])
+            assert default_token_generator.check_token(provisioned, code)
+
+        call_command('provision_users', str(path))
+        out, _ = capsys.readouterr()
+        assert 'Создано пользователей: 0, уже существовало: 4' in out
+
+    def test_02_non_ascii_usernames(self, tmp_path, capsys,
+                                    django_user_model):
+        django_user_model.objects.create(
+            username='Пётр', email='petr@yamdb.fake'
+        )
+        path = tmp_path / 'users.jsonl'
+        path.write_text(
+            '{"username": "Иван", "email": "ivan@yamdb.fake"}\n'
+            '{"username": "Olga", "email": "Olga@yamdb.fake"}\n'
+            '{"username": "Пётр", "email": "petr@yamdb.fake"}\n'
+            '{"username": "olga", "email": "olga2@yamdb.fake"}\n',
+            encoding='utf-8',
+        )
+        call_command('provision_users', str(path))
+        out, err = capsys.readouterr()
+        assert 'Создано пользователей: 2, уже существовало: 1, ' \
+               'отклонено: 1, отправлено писем: 2.' in out
+        assert 'Запись 4: Повтор в файле.' in err
+        assert sorted(message.to[0] for message in mail.outbox) == [
+            'Olga@yamdb.fake', 'ivan@yamdb.fake'
+        ]
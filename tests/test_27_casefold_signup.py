@@ -0,0 +1,69 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.db import IntegrityError, connection
+
+from users.models import OutgoingEmail, User
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27CasefoldSignup:
+
+    def test_01_same_user_any_case(self, client):
+        data = {'username': 'Bob', 'email': 'Bob@Yamdb.fake'}
+        assert client.post(SIGNUP_URL, data=data).status_code == HTTPStatus.OK
+        response = client.post(SIGNUP_URL, data={
+            'username': 'bob', 'email': 'bob@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.OK
+        assert User.objects.count() == 1
+        assert set(OutgoingEmail.objects.values_list('to', flat=True)) == {
+            'Bob@Yamdb.fake'
+        }
+        user = User.objects.get()
+        response = client.post('/api/v1/auth/token/', data={
+            'username': 'BOB',
+            'confirmation_code': default_token_generator.make_token(user),
+        })
+        assert response.status_code == HTTPStatus.OK
+
+    def test_02_precise_conflicts(self, client, user, admin):
+        response = client.post(SIGNUP_URL, data={
+            'username': user.username.upper(), 'email': 'new@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert set(response.json()) == {'username'}
+
+        response = client.post(SIGNUP_URL, data={
+            'username': 'newcomer', 'email': user.email.upper()
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert set(response.json()) == {'email'}
+
+        response = client.post(SIGNUP_URL, data={
+            'username': user.username.lower(), 'email': admin.email
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert set(response.json()) == {'username', 'email'}
+        assert User.objects.count() == 2
+
+    def test_03_unique_indexes(self, user, admin_client):
+        with pytest.raises(IntegrityError):
+            User.objects.create(
+                username=user.username.swapcase(), email='x@yamdb.fake'
+            )
+        response = admin_client.post('/api/v1/users/', data={
+            'username': user.username.swapcase(), 'email': 'y@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert set(response.json()) == {'username'}
+
+    @pytest.mark.skipif(connection.vendor != 'sqlite',
+                        reason='План запроса SQLite')
+    def test_04_lookup_uses_indexes(self):
+        plan = User.find_casefold('Bob', 'bob@yamdb.fake').explain()
+        assert 'users_user_username_ci_uniq' in plan
+        assert 'users_user_email_ci_uniq' in plan